@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Bucket size accounting through the google.cloud.storage client.
+
+Sums object sizes under a gs:// bucket or prefix by streaming paged object listings from the
+shared storage_client_ops client, instead of parsing `gcloud storage du` / `ls --long` text.
+The listing is split into folder prefixes (walking at most PARTITION_DEPTH levels down) that are
+listed in parallel; each partition folds its pages into running totals as they arrive, so no
+full listing is held in memory.
+
+Also runnable as a CLI; the default output matches `gcloud storage du -s`:
+	python3 bucket_usage.py gs://bucket[/prefix] [--by-folder] [--depth N] [-j N] [--billing-project P]
+"""
+
+import sys
+import logging
+import argparse
+from dataclasses import dataclass
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from storage_client_ops import get_client, split_gs_path
+
+
+MAX_WORKERS = 16
+# Folder levels walked (with delimiter listings) to find prefixes to list in parallel
+PARTITION_DEPTH = 2
+# Stop walking down once there are this many partitions per worker
+PARTITIONS_PER_WORKER = 4
+
+
+@dataclass
+class FolderUsage:
+	n_bytes: int = 0
+	n_objects: int = 0
+
+	def add(self, size):
+		self.n_bytes += size
+		self.n_objects += 1
+
+	def merge(self, other):
+		self.n_bytes += other.n_bytes
+		self.n_objects += other.n_objects
+
+
+def _list_partition(bucket, prefix, summarize, delimiter=None):
+	"""
+	Stream one listing through `summarize` (folder placeholder objects are skipped).
+
+	Returns (summarize result, sub-prefixes); sub-prefixes are only reported for delimiter listings.
+	"""
+	blobs = bucket.list_blobs(prefix=prefix, delimiter=delimiter)
+	result = summarize(blob for blob in blobs if not blob.name.endswith("/"))
+	return result, sorted(blobs.prefixes) if delimiter else []
+
+
+def _scan(path, summarize, max_workers=MAX_WORKERS, billing_project=None):
+	"""
+	List every object under a gs:// bucket or prefix in parallel partitions.
+
+	`summarize` is called (from worker threads) once per listing with an iterator over its blobs
+	and must consume it; the list of its results is returned for the caller to merge.
+	"""
+	bucket_name, name = split_gs_path(str(path))
+	prefix = f"{name.rstrip('/')}/" if name else ""
+	bucket = get_client().bucket(bucket_name, user_project=billing_project)
+
+	results = []
+	with ThreadPoolExecutor(max_workers=max_workers) as executor:
+		# Objects directly inside each walked folder are summarized by its delimiter listing,
+		# everything deeper belongs to exactly one of the sub-prefixes it reports
+		partitions = [prefix]
+		for _level in range(PARTITION_DEPTH):
+			walked = list(executor.map(lambda partition: _list_partition(bucket, partition, summarize, delimiter="/"), partitions))
+			partitions = []
+			for result, sub_prefixes in walked:
+				results.append(result)
+				partitions.extend(sub_prefixes)
+			if len(partitions) >= max_workers * PARTITIONS_PER_WORKER:
+				break
+		for result, _sub_prefixes in executor.map(lambda partition: _list_partition(bucket, partition, summarize), partitions):
+			results.append(result)
+	logging.debug(f"Listed {path} in {len(results)} partitions")
+	return results
+
+
+def _folder_key(name, prefix, depth):
+	"""prefix/a/b/c.fastq.gz -> 'a/b' (depth 2) or 'a' (depth 1); objects directly under prefix -> ''"""
+	return "/".join(name[len(prefix):].split("/")[:-1][:depth])
+
+
+def folder_usage(path, depth=1, max_workers=MAX_WORKERS, billing_project=None):
+	"""
+	Per-folder byte and object totals under a gs:// bucket or prefix.
+
+	Returns {folder: FolderUsage} keyed by the first `depth` folder levels below `path`
+	('' for objects directly under it; depth=0 puts everything under '').
+	"""
+	bucket_name, name = split_gs_path(str(path))
+	prefix = f"{name.rstrip('/')}/" if name else ""
+
+	def summarize(blobs):
+		usage = defaultdict(FolderUsage)
+		for blob in blobs:
+			usage[_folder_key(blob.name, prefix, depth)].add(blob.size or 0)
+		return usage
+
+	totals = defaultdict(FolderUsage)
+	for usage in _scan(path, summarize, max_workers=max_workers, billing_project=billing_project):
+		for folder, partial in usage.items():
+			totals[folder].merge(partial)
+	return dict(totals)
+
+
+def bucket_usage(path, max_workers=MAX_WORKERS, billing_project=None):
+	"""Total bytes and objects under a gs:// bucket or prefix, as one FolderUsage."""
+	return folder_usage(path, depth=0, max_workers=max_workers, billing_project=billing_project).get("", FolderUsage())
+
+
+def list_object_sizes(path, max_workers=MAX_WORKERS, billing_project=None):
+	"""Recursively list a gs:// bucket or prefix, returning {gs://bucket/name: size_bytes}."""
+	bucket_name, _name = split_gs_path(str(path))
+	sizes = {}
+	for partial in _scan(path, lambda blobs: {f"gs://{bucket_name}/{blob.name}": blob.size or 0 for blob in blobs}, max_workers=max_workers, billing_project=billing_project):
+		sizes.update(partial)
+	return sizes
+
+
+def main(args):
+	if args.by_folder:
+		usage = folder_usage(args.path, depth=args.depth, max_workers=args.jobs, billing_project=args.billing_project)
+		sys.stdout.write("folder\tn_bytes\tn_objects\n")
+		for folder, folder_total in sorted(usage.items()):
+			sys.stdout.write(f"{folder}\t{folder_total.n_bytes}\t{folder_total.n_objects}\n")
+		return
+	total = bucket_usage(args.path, max_workers=args.jobs, billing_project=args.billing_project)
+	sys.stdout.write(f"{total.n_bytes}  {args.path}\n")
+
+
+__all__ = [
+    "MAX_WORKERS", "PARTITION_DEPTH", "FolderUsage",
+    "folder_usage", "bucket_usage", "list_object_sizes",
+]
+
+
+if __name__ == "__main__":
+	logging.basicConfig(
+		level=logging.INFO,
+		format="%(asctime)s - %(levelname)s - %(message)s"
+	)
+
+	parser = argparse.ArgumentParser(
+		description="Sum object sizes under a gs:// bucket or prefix with parallel, paged storage client listings."
+	)
+	parser.add_argument(
+		"path",
+		type=str,
+		help="gs://bucket or gs://bucket/prefix to size."
+	)
+	parser.add_argument(
+		"--by-folder",
+		action="store_true",
+		required=False,
+		help="Print a folder/n_bytes/n_objects TSV instead of the `gcloud storage du -s` style total."
+	)
+	parser.add_argument(
+		"--depth",
+		type=int,
+		default=1,
+		required=False,
+		help="Folder levels below the path to group by with --by-folder (default: 1)."
+	)
+	parser.add_argument(
+		"-j",
+		"--jobs",
+		type=int,
+		default=MAX_WORKERS,
+		required=False,
+		help=f"Prefixes listed in parallel (default: {MAX_WORKERS})."
+	)
+	parser.add_argument(
+		"--billing-project",
+		type=str,
+		required=False,
+		help="Project to bill requests to (requester-pays buckets)."
+	)
+
+	args = parser.parse_args()
+	main(args)
@@ -4,13 +4,19 @@
 # CRN Cloud datasets
 
 import os
+import re
+import time
+import bisect
 import logging
+import tempfile
 import subprocess
+from abc import ABC, abstractmethod
 from pathlib import Path
 from gcloud_ops import list_dirs
 from collections import defaultdict
+from dataclasses import dataclass
 
-from file_utils import parse_file_size_to_bytes
+from file_utils import format_size_bytes
 
 logging.basicConfig(
     level=logging.INFO,
@@ -416,6 +422,77 @@ def validate_local_release_resources_structure(
     return validated_files
 
 
+@dataclass(frozen=True, slots=True)
+class BucketFile:
+    """One object from a bucket listing, with its exact size and hashes."""
+    path: str
+    size: int
+    md5_hash: str | None
+    crc32c: str | None
+    updated: str | None
+
+    @property
+    def size_str(self) -> str:
+        """Human-readable size, only computed when a report needs it."""
+        return format_size_bytes(self.size)
+
+
+def iter_bucket_listing(gs_bucket: str, log_file: Path = None):
+    """
+    Stream `gcloud storage objects list` over the whole bucket and yield one
+    BucketFile per object as its line arrives.
+
+    Each line carries the object's exact byte size, MD5/CRC32C hashes and
+    update time (tab-separated `value(...)` output), so no size strings are
+    parsed. The listing is read line by line rather than captured whole, so
+    large buckets are never held in memory as text.
+
+    Parameters
+    ----------
+    gs_bucket : str
+        GCS bucket URL.
+    log_file : Path, optional
+        If provided, every raw output line is also written (teed) to this file.
+
+    Yields
+    ------
+    BucketFile
+        One record per object; folder placeholders are skipped.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If gcloud exits non-zero (raised once the listing has been consumed).
+    """
+    gs_bucket = gs_bucket.rstrip('/')
+    cmd = [
+        "gcloud", "storage", "objects", "list",
+        f"{gs_bucket}/**",
+        "--format=value(name,size,md5_hash,crc32c_hash,update_time)",
+    ]
+    log = open(log_file, 'w') if log_file else None
+    # stderr goes to a temp file so a chatty gcloud can never block the stdout pipe
+    with tempfile.TemporaryFile(mode='w+') as stderr_file:
+        try:
+            with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True) as process:
+                for line in process.stdout:
+                    if log:
+                        log.write(line)
+                    fields = line.rstrip('\n').split('\t')
+                    if len(fields) != 5 or not fields[1].isdigit():
+                        continue
+                    name, size, md5_hash, crc32c, updated = fields
+                    if name.endswith('/'):
+                        continue
+                    yield BucketFile(f"{gs_bucket}/{name}", int(size), md5_hash or None, crc32c or None, updated or None)
+        finally:
+            if log:
+                log.close()
+        if process.returncode:
+            stderr_file.seek(0)
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr_file.read())
+
+
 def list_bucket_structure(gs_bucket: str, temp_dir: Path = None, save_log: bool = False,
                           case_folders: list = None) -> tuple:
     """
@@ -426,7 +503,7 @@ def list_bucket_structure(gs_bucket: str, temp_dir: Path = None, save_log: bool
     gs_bucket : str
         GCS bucket URL.
     temp_dir : Path, optional
-        Directory to save the raw gcloud ls output log.
+        Directory to save the raw gcloud listing log.
     save_log : bool
         If True and `temp_dir` is provided, write gcloud output to a log file.
     case_folders : list, optional
@@ -436,54 +513,27 @@ def list_bucket_structure(gs_bucket: str, temp_dir: Path = None, save_log: bool
     -------
     tuple
         structure : dict
-            Lowercase folder names as keys, lists of file-info dicts as values.
-            Each file-info dict has 'path', 'size' (bytes), 'size_str'.
+            Lowercase folder names as keys, lists of BucketFile records as values
+            (exact 'size' in bytes; 'size_str' is derived on access).
         folder_name_map : dict
             Mapping of lowercase name → actual case-preserved name from the bucket.
         case_warnings : list of dict
             One entry per folder with a case mismatch: {'expected': str, 'found': str}.
     """
     print(f"  Listing bucket structure...")
-    cmd = [
-        "gcloud", "storage", "ls",
-        "--recursive",
-        "--long",
-        "--readable-sizes",
-        gs_bucket,
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-
-    if save_log and temp_dir:
-        log_file = temp_dir / "gcloud_ls_output.txt"
-        with open(log_file, 'w') as f:
-            f.write(result.stdout)
-        print(f"  Saved gcloud ls output to: {log_file}")
+    log_file = temp_dir / "gcloud_ls_output.txt" if save_log and temp_dir else None
 
     structure = defaultdict(list)
     folder_name_map = {}
     case_warnings = []
 
-    for line in result.stdout.strip().split('\n'):
-        line = line.strip()
-        if not line or line.startswith('TOTAL:') or line.endswith(':'):
-            continue
-
-        parts = line.split(None, 2)
-        if len(parts) != 3:
-            continue
-        size_str, _date_str, path = parts
-        size_bytes = parse_file_size_to_bytes(size_str)
-
-        if path.endswith('/'):
-            continue
-
+    for file_info in iter_bucket_listing(gs_bucket, log_file):
+        path = file_info.path
         filename = os.path.basename(path)
         if filename.startswith('.'):
             continue
 
-        file_info = {'path': path, 'size': size_bytes, 'size_str': size_str}
-
-        path_parts = path.replace(gs_bucket + '/', '').split('/')
+        path_parts = path.replace(gs_bucket.rstrip('/') + '/', '').split('/')
         if len(path_parts) > 1:
             folder_original = path_parts[0]
             folder_lower = folder_original.lower()
@@ -496,4 +546,414 @@ def list_bucket_structure(gs_bucket: str, temp_dir: Path = None, save_log: bool
         else:
             structure['root'].append(file_info)
 
+    if log_file:
+        print(f"  Saved gcloud listing output to: {log_file}")
+
     return dict(structure), folder_name_map, case_warnings
+
+
+# ---- DATA.csv ↔ bucket file matching
+
+# Illumina FASTQ naming suffixes after normalization (lowercase, hyphens → underscores).
+# Full form: <sample>_S<n>_L<n>_[R|I]<n>_<nnn>.fastq.gz
+_FULL_ILLUMINA_SUFFIX_RE = re.compile(r'_s\d+_l\d+_[ri]\d+_\d{3}\.fastq\.gz$')
+# Read + chunk form (no sample index): strips only _R<n>_<nnn>.fastq.gz so _L<n> stays in stem
+_READ_CHUNK_ILLUMINA_SUFFIX_RE = re.compile(r'_[ri]\d+_\d{3}\.fastq\.gz$')
+# Read form: <sample>_[R|I]<n>.fastq.gz
+_READ_ILLUMINA_SUFFIX_RE = re.compile(r'_[ri]\d+\.fastq\.gz$')
+# Tried in order; the first suffix that matches decides the match type
+_ILLUMINA_SUFFIX_PATTERNS = (
+    (_FULL_ILLUMINA_SUFFIX_RE, 'illumina_suffix_full'),
+    (_READ_CHUNK_ILLUMINA_SUFFIX_RE, 'illumina_suffix_read_chunk'),
+    (_READ_ILLUMINA_SUFFIX_RE, 'illumina_suffix_read'),
+)
+
+# Trailing _<digits> chunk/replicate number, ignored by numeric_suffix_mismatch matching
+_TRAILING_NUMBER_RE = re.compile(r'_\d+$')
+
+# Known FASTQ extensions stripped from DATA.csv file_name values to derive the sample stem.
+# Ordered longest-first so '.fastq.gz' is matched before '.gz'.
+_FASTQ_EXTENSIONS = ('.fastq.gz', '.fq.gz', '.fastq', '.fq')
+
+
+def _normalize_filename(name: str) -> str:
+    """Lowercase and replace hyphens with underscores for fuzzy comparison."""
+    return name.lower().replace('-', '_')
+
+
+def _csv_stem(csv_norm: str) -> str:
+    """
+    Strip known FASTQ extensions from a normalized DATA file_name to get the sample stem.
+
+    Parameters
+    ----------
+    csv_norm : str
+        Normalized file_name value (lowercase, hyphens → underscores).
+
+    Returns
+    -------
+    str
+        Sample stem, or the full name if no known extension matched.
+    """
+    for ext in _FASTQ_EXTENSIONS:
+        if csv_norm.endswith(ext):
+            return csv_norm[:-len(ext)]
+    return csv_norm
+
+
+def _find_prefix_stem(stem: str, sorted_stems: list, stem_set: set) -> tuple:
+    """
+    Find the first bucket stem (in sorted order) that is underscore-bounded
+    prefix-related to a DATA stem.
+
+    A bucket stem matches if it equals `stem`, extends it (`stem_...`), or is
+    extended by it (`<bucket stem>_...`). Any match of the last kind is a
+    proper prefix of `stem` and so sorts before every match of the first two,
+    and shorter prefixes sort first; only the underscore positions of `stem`
+    need probing, then one bisect into `sorted_stems` covers the rest.
+
+    Parameters
+    ----------
+    stem : str
+        Normalized DATA file stem.
+    sorted_stems : list of str
+        Bucket stems, sorted.
+    stem_set : set of str
+        The same bucket stems, for O(1) membership tests.
+
+    Returns
+    -------
+    tuple or None
+        (bucket_stem, match_type) with match_type 'bucket_prefix_of_DATA' or
+        'DATA_prefix_of_bucket', or None if no bucket stem is related.
+    """
+    underscore = stem.find('_')
+    while underscore != -1:
+        if stem[:underscore] in stem_set:
+            return stem[:underscore], 'bucket_prefix_of_DATA'
+        underscore = stem.find('_', underscore + 1)
+
+    if stem in stem_set:
+        return stem, 'DATA_prefix_of_bucket'
+    idx = bisect.bisect_left(sorted_stems, stem + '_')
+    if idx < len(sorted_stems) and sorted_stems[idx].startswith(stem + '_'):
+        return sorted_stems[idx], 'DATA_prefix_of_bucket'
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class FileMatch:
+    """One DATA file_name resolved to the bucket file(s) it corresponds to."""
+    data_name: str
+    bucket_names: tuple
+    match_type: str
+
+
+class FileNameIndex:
+    """
+    Normalized forms of file names, computed at most once per name and shared
+    by every stage of a `FileMatcher` run.
+    """
+
+    def __init__(self):
+        self._norm = {}
+        self._stem = {}
+        self._illumina = {}
+
+    def norm(self, name: str) -> str:
+        """Lowercased name with hyphens replaced by underscores."""
+        norm = self._norm.get(name)
+        if norm is None:
+            norm = self._norm[name] = _normalize_filename(name)
+        return norm
+
+    def stem(self, name: str) -> str:
+        """Normalized name without its FASTQ extension."""
+        stem = self._stem.get(name)
+        if stem is None:
+            stem = self._stem[name] = _csv_stem(self.norm(name))
+        return stem
+
+    def illumina(self, name: str) -> tuple:
+        """
+        Normalized name with its Illumina FASTQ suffix stripped.
+
+        Returns
+        -------
+        tuple
+            (stripped name, match_type) for the first suffix in
+            `_ILLUMINA_SUFFIX_PATTERNS` that matched, or (normalized name, None).
+        """
+        stripped = self._illumina.get(name)
+        if stripped is None:
+            norm = self.norm(name)
+            stripped = (norm, None)
+            for suffix_re, match_type in _ILLUMINA_SUFFIX_PATTERNS:
+                name_stripped = suffix_re.sub('', norm)
+                if name_stripped != norm:
+                    stripped = (name_stripped, match_type)
+                    break
+            self._illumina[name] = stripped
+        return stripped
+
+
+class MatchStrategy(ABC):
+    """
+    One stage of a `FileMatcher` pipeline.
+
+    Subclasses set `name` (the stage key in `MatchResult`) and implement
+    `match`. A stage only sees the names left unmatched by earlier stages and
+    is skipped once nothing is left for it to match; the pipeline removes the
+    names it matched before running the next stage.
+
+    Attributes
+    ----------
+    name : str
+        Stage name, unique within a pipeline.
+    uses_bucket_files : bool
+        Whether the stage matches against the bucket names (and so consumes
+        them). Stages that look elsewhere, e.g. `FolderLookupMatch`, set False.
+    """
+    name = ''
+    uses_bucket_files = True
+
+    @abstractmethod
+    def match(self, data_names: set, bucket_names: set, index: FileNameIndex) -> list:
+        """
+        Match DATA names to bucket names.
+
+        Parameters
+        ----------
+        data_names : set of str
+            DATA file names still unmatched. Must not be modified.
+        bucket_names : set of str
+            Bucket file names still unmatched. Must not be modified.
+        index : FileNameIndex
+            Shared normalized forms of both.
+
+        Returns
+        -------
+        list of FileMatch
+            At most one per DATA name. Several DATA names may claim the same
+            bucket file within one stage.
+        """
+
+
+class ExactMatch(MatchStrategy):
+    """DATA file_name equals a bucket file name."""
+    name = 'exact'
+
+    def match(self, data_names, bucket_names, index):
+        return [FileMatch(name, (name,), 'exact') for name in sorted(data_names & bucket_names)]
+
+
+class IlluminaSuffixMatch(MatchStrategy):
+    """
+    DATA file stem equals a bucket file name with its Illumina suffix stripped
+    (files need renaming, not errors). All bucket files sharing the stem match.
+    """
+    name = 'illumina_suffix'
+
+    def match(self, data_names, bucket_names, index):
+        illumina_bucket_map = defaultdict(list)
+        for name_in_bucket in bucket_names:
+            stripped, match_type = index.illumina(name_in_bucket)
+            if match_type is not None:
+                illumina_bucket_map[stripped].append((name_in_bucket, match_type))
+
+        matches = []
+        for name_in_data in sorted(data_names):
+            entries = illumina_bucket_map.get(index.stem(name_in_data))
+            if entries:
+                entries = sorted(entries, key=lambda x: x[0])
+                types = sorted({mt for _, mt in entries})
+                match_type = types[0] if len(types) == 1 else 'illumina_suffix_mixed'
+                matches.append(FileMatch(name_in_data, tuple(b for b, _ in entries), match_type))
+        return matches
+
+
+class FuzzyMatch(MatchStrategy):
+    """
+    Typos that are still errors: names equal after normalization
+    ('separator_mismatch'), or equal once a trailing _<digits> is dropped from
+    the stem ('numeric_suffix_mismatch').
+    """
+    name = 'fuzzy'
+
+    def match(self, data_names, bucket_names, index):
+        bucket_norm_map = {index.norm(b): b for b in bucket_names}
+        # (stem without trailing _<digits>, extension) → first bucket name in
+        # bucket_norm_map order, so each DATA name resolves with one lookup
+        bucket_numeric_index = {}
+        for b_norm, b_name in bucket_norm_map.items():
+            b_stem_val = index.stem(b_name)
+            b_ext = b_norm[len(b_stem_val):]
+            bucket_numeric_index.setdefault((_TRAILING_NUMBER_RE.sub('', b_stem_val), b_ext), b_name)
+
+        matches = []
+        for csv_name in sorted(data_names):
+            csv_norm = index.norm(csv_name)
+            if csv_norm in bucket_norm_map:
+                matches.append(FileMatch(csv_name, (bucket_norm_map[csv_norm],), 'separator_mismatch'))
+                continue
+            csv_stem_val = index.stem(csv_name)
+            csv_ext = csv_norm[len(csv_stem_val):]
+            csv_stem_stripped = _TRAILING_NUMBER_RE.sub('', csv_stem_val)
+            if not csv_stem_stripped:
+                continue
+            b_name = bucket_numeric_index.get((csv_stem_stripped, csv_ext))
+            if b_name is not None:
+                matches.append(FileMatch(csv_name, (b_name,), 'numeric_suffix_mismatch'))
+        return matches
+
+
+class PrefixMatch(MatchStrategy):
+    """
+    DATA stem and a bucket stem (Illumina suffix stripped) contain one another
+    on an underscore boundary. All bucket files sharing the stem match.
+    """
+    name = 'prefix'
+
+    def match(self, data_names, bucket_names, index):
+        bucket_stem_map = defaultdict(list)
+        for name_in_bucket in bucket_names:
+            bucket_stem_map[_csv_stem(index.illumina(name_in_bucket)[0])].append(name_in_bucket)
+        sorted_bucket_stems = sorted(bucket_stem_map)
+        bucket_stem_set = set(sorted_bucket_stems)
+
+        matches = []
+        for name_in_data in sorted(data_names):
+            csv_stem_val = index.stem(name_in_data)
+            if not csv_stem_val:
+                continue
+            found = _find_prefix_stem(csv_stem_val, sorted_bucket_stems, bucket_stem_set)
+            if found:
+                b_stem, match_type = found
+                matches.append(FileMatch(name_in_data, tuple(sorted(bucket_stem_map[b_stem])), match_type))
+        return matches
+
+
+class FolderLookupMatch(MatchStrategy):
+    """
+    DATA file found (up to normalization) in another bucket folder, e.g.
+    spatial/. Matches are typed 'found_in_<folder>' and do not consume
+    bucket names.
+    """
+    uses_bucket_files = False
+
+    def __init__(self, folder_name: str, folder_files: list):
+        """
+        Parameters
+        ----------
+        folder_name : str
+            Folder to report matches against (e.g. 'spatial').
+        folder_files : list of BucketFile
+            The folder's listing.
+        """
+        self.folder_name = folder_name
+        self.folder_files = folder_files
+        self.name = f'found_in_{folder_name}'
+
+    def match(self, data_names, bucket_names, index):
+        folder_norms = {
+            index.norm(os.path.basename(f.path))
+            for f in self.folder_files
+            if not f.path.endswith('/')
+        }
+        return [
+            FileMatch(name, (name,), self.name)
+            for name in sorted(data_names)
+            if index.norm(name) in folder_norms
+        ]
+
+
+def default_match_strategies(extra_folder_files: dict = None) -> list:
+    """
+    The DATA ↔ raw/ matching stages, in order: exact, Illumina suffix, fuzzy,
+    prefix, then a lookup in each extra folder.
+
+    Parameters
+    ----------
+    extra_folder_files : dict, optional
+        Folder name → BucketFile list, searched (in order) for DATA files not
+        matched in the main listing.
+
+    Returns
+    -------
+    list of MatchStrategy
+    """
+    strategies = [ExactMatch(), IlluminaSuffixMatch(), FuzzyMatch(), PrefixMatch()]
+    for folder_name, folder_files in (extra_folder_files or {}).items():
+        strategies.append(FolderLookupMatch(folder_name, folder_files))
+    return strategies
+
+
+@dataclass
+class MatchResult:
+    """
+    Outcome of a `FileMatcher` run.
+
+    Attributes
+    ----------
+    matches : dict
+        Stage name → list of FileMatch, in pipeline order (only stages that ran).
+    unmatched_data : set of str
+        DATA names no stage matched.
+    unmatched_bucket : set of str
+        Bucket names no stage matched.
+    stage_seconds : dict
+        Stage name → wall-clock seconds spent in its `match`.
+    """
+    matches: dict
+    unmatched_data: set
+    unmatched_bucket: set
+    stage_seconds: dict
+
+
+class FileMatcher:
+    """
+    Reconcile DATA file names with bucket file names through an ordered list
+    of `MatchStrategy` stages over one shared `FileNameIndex`.
+    """
+
+    def __init__(self, strategies: list = None):
+        """
+        Parameters
+        ----------
+        strategies : list of MatchStrategy, optional
+            Stages to run in order. Defaults to `default_match_strategies()`.
+        """
+        self.strategies = list(strategies) if strategies is not None else default_match_strategies()
+
+    def run(self, data_names, bucket_names) -> MatchResult:
+        """
+        Run every stage on the names left unmatched by the stages before it.
+
+        Parameters
+        ----------
+        data_names : iterable of str
+            DATA file names (basenames).
+        bucket_names : iterable of str
+            Bucket file names (basenames).
+
+        Returns
+        -------
+        MatchResult
+        """
+        index = FileNameIndex()
+        unmatched_data = set(data_names)
+        unmatched_bucket = set(bucket_names)
+        matches = {}
+        stage_seconds = {}
+        for strategy in self.strategies:
+            if not unmatched_data or (strategy.uses_bucket_files and not unmatched_bucket):
+                continue
+            start = time.perf_counter()
+            stage_matches = strategy.match(unmatched_data, unmatched_bucket, index)
+            stage_seconds[strategy.name] = time.perf_counter() - start
+            logging.debug(f"Match stage '{strategy.name}': {len(stage_matches)} match(es) in {stage_seconds[strategy.name]:.3f}s")
+            matches[strategy.name] = stage_matches
+            unmatched_data -= {m.data_name for m in stage_matches}
+            if strategy.uses_bucket_files:
+                unmatched_bucket -= {b for m in stage_matches for b in m.bucket_names}
+        return MatchResult(matches, unmatched_data, unmatched_bucket, stage_seconds)
@@ -1,83 +1,224 @@
 #!/usr/bin/env python3
 """Data-integrity checks for staging -> production promotion.
 
-Operates on google.cloud.storage Bucket objects: gathers release file lists,
-reads MANIFEST.tsv files, runs MD5 / non-empty / associated-metadata checks,
-and compares staging vs. curated blob names and hashes.
+Operates on google.cloud.storage Bucket objects: lists a release once into a
+ReleaseSnapshot, gathers release file lists, reads MANIFEST.tsv files, runs
+MD5 / non-empty / associated-metadata checks, and compares staging vs. curated
+blob names and hashes.
 """
 
 import re
 import logging
+import contextvars
 import pandas as pd
-from io import StringIO
+from io import BytesIO
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
+# Default number of MANIFEST.tsv files downloaded concurrently by read_manifest_files
+MANIFEST_DOWNLOAD_WORKERS = 8
 
-def list_gs_files(bucket, release_version, workflow_name):
-	blobs = bucket.list_blobs(prefix=workflow_name) # This skips the curated metadata and artifacts directories
+
+def release_prefix(workflow_name, release_version):
+	return f"{workflow_name}/release/{release_version}/"
+
+
+def _list_subfolders(bucket, prefix):
+	"""Immediate sub-folder names under `prefix`, using a delimiter listing so nested objects are not fetched."""
+	blobs = bucket.list_blobs(prefix=prefix, delimiter="/")
+	# Prefixes are only populated once the iterator has been consumed
+	for _ in blobs:
+		pass
+	return sorted(prefix.rstrip("/").split("/")[-1] for prefix in blobs.prefixes)
+
+
+def list_release_versions(bucket, workflow_name):
+	"""Release versions under `{workflow_name}/release/`, using a delimiter listing so no objects are fetched."""
+	return _list_subfolders(bucket, f"{workflow_name}/release/")
+
+
+def get_combined_manifest_loc(bucket, workflow_name):
+	"""
+	gs:// path of the most recent combined MANIFEST.tsv under `{workflow_name}/release/`, or "".
+
+	Combined manifests live at `release/<release_version>/workflow_metadata/<timestamp>/MANIFEST.tsv`;
+	release versions and timestamps are walked newest-first with delimiter listings, so only the
+	folder names and one existence check per candidate are fetched instead of the whole release tree.
+	"""
+	for release_version in reversed(list_release_versions(bucket, workflow_name)):
+		workflow_metadata_prefix = f"{release_prefix(workflow_name, release_version)}workflow_metadata/"
+		for timestamp in reversed(_list_subfolders(bucket, workflow_metadata_prefix)):
+			manifest_name = f"{workflow_metadata_prefix}{timestamp}/MANIFEST.tsv"
+			if bucket.blob(manifest_name).exists():
+				return f"gs://{bucket.name}/{manifest_name}"
+	return ""
+
+
+@dataclass(frozen=True)
+class ReleaseBlob:
+	"""Metadata captured for one object during the release listing pass."""
+	name: str
+	size: int
+	md5_hash: str | None
+	crc32c: str | None
+	generation: int | None
+	updated: datetime | None
+
+
+@dataclass
+class ReleaseSnapshot:
+	"""
+	One listing pass over a bucket's `{workflow_name}/release/{release_version}/` objects.
+
+	Built once per bucket/environment and consumed by list_gs_files, read_manifest_files,
+	md5_check and non_empty_check so the bucket is not re-listed for every check.
+	"""
+	bucket: object
+	release_version: str
+	workflow_name: str
+	blobs: list[ReleaseBlob] = field(default_factory=list)
+
+	@classmethod
+	def from_bucket(cls, bucket, release_version, workflow_name):
+		# The release path is pushed into the server-side prefix so only objects in the target
+		# release are listed (this skips the curated metadata/artifacts directories, historic
+		# releases and workflow_execution/)
+		blobs = bucket.list_blobs(prefix=release_prefix(workflow_name, release_version))
+		release_blobs = [
+			ReleaseBlob(
+				name=blob.name,
+				size=blob.size,
+				md5_hash=blob.md5_hash,
+				crc32c=blob.crc32c,
+				generation=blob.generation,
+				updated=blob.updated,
+			)
+			for blob in blobs
+		]
+		return cls(bucket, release_version, workflow_name, release_blobs)
+
+	@property
+	def bucket_name(self):
+		return self.bucket.name
+
+	def gs_path(self, blob_name):
+		return f"gs://{self.bucket_name}/{blob_name}"
+
+
+def list_gs_files(snapshot):
 	blob_names = []
 	gs_files = []
 	sample_list_loc = []
-	pattern = re.compile(rf"{workflow_name}/release/{release_version}/") # This checks for the most recent release version
-	for blob in blobs:
-		if pattern.match(blob.name):
-			blob_names.append(blob.name)
-			gs_files.append(f"gs://{bucket.name}/{blob.name}")
-			if blob.name.endswith("sample_list.tsv"):
-				sample_list_loc.append(f"gs://{bucket.name}/{blob.name}")
+	for blob in snapshot.blobs:
+		blob_names.append(blob.name)
+		gs_files.append(snapshot.gs_path(blob.name))
+		if blob.name.endswith("sample_list.tsv"):
+			sample_list_loc.append(snapshot.gs_path(blob.name))
 	return blob_names, gs_files, sample_list_loc
 
 
-def read_manifest_files(bucket, release_version, workflow_name):
-	blobs = bucket.list_blobs(prefix=workflow_name) # This has to be called again because 'Iterator has already started'
-	manifest_dfs = []
-	pattern = re.compile(rf"{workflow_name}/release/{release_version}/")
-	for blob in blobs:
-		if blob.name.endswith("MANIFEST.tsv") and pattern.match(blob.name):
-			gs_path = f"gs://{bucket.name}/{blob.name}"
-			logging.info(f"Reading manifest: {gs_path}")
-			content = blob.download_as_text()
-			try:
-				manifest_df = pd.read_csv(StringIO(content), sep="\t")
-			except pd.errors.ParserError as e:
-				raise pd.errors.ParserError(
-					f"Failed to parse {gs_path}: {e}"
-				) from e
-			manifest_dfs.append(manifest_df)
+def _read_manifest_file(snapshot, release_blob):
+	gs_path = snapshot.gs_path(release_blob.name)
+	logging.info(f"Reading manifest: {gs_path}")
+	# Pin the generation seen during listing so the manifest matches the snapshot
+	blob = snapshot.bucket.blob(release_blob.name, generation=release_blob.generation)
+	content = blob.download_as_bytes()
+	try:
+		return pd.read_csv(BytesIO(content), sep="\t")
+	except pd.errors.ParserError as e:
+		raise pd.errors.ParserError(
+			f"Failed to parse {gs_path}: {e}"
+		) from e
+
+
+def read_manifest_files(snapshot, max_workers=MANIFEST_DOWNLOAD_WORKERS):
+	"""
+	Download and parse every MANIFEST.tsv in the snapshot and concatenate them.
+
+	Manifests are fetched on a thread pool of at most `max_workers` threads (1 reads them serially);
+	the combined frame keeps the snapshot's listing order.
+	"""
+	manifest_blobs = [blob for blob in snapshot.blobs if blob.name.endswith("MANIFEST.tsv")]
+	if max_workers <= 1:
+		manifest_dfs = [_read_manifest_file(snapshot, blob) for blob in manifest_blobs]
+	else:
+		with ThreadPoolExecutor(max_workers=max_workers) as executor:
+			# Pool threads don't inherit contextvars; run each download in a copy of the caller's
+			# context
+			futures = [
+				executor.submit(contextvars.copy_context().run, _read_manifest_file, snapshot, blob)
+				for blob in manifest_blobs
+			]
+			manifest_dfs = [future.result() for future in futures]
 	combined_df = pd.concat(manifest_dfs, ignore_index=True)
 	return combined_df
 
 
-def md5_check(bucket, release_version, workflow_name):
-	blobs = bucket.list_blobs(prefix=workflow_name)
-	hashes = {}
-	pattern = re.compile(rf"{workflow_name}/release/{release_version}/")
-	for blob in blobs:
-		if pattern.match(blob.name):
-			hashes[blob] = blob.md5_hash
-	return hashes
+def md5_check(snapshot):
+	return {blob.name: blob.md5_hash for blob in snapshot.blobs}
 
 
-def non_empty_check(bucket, release_version, workflow_name, GREEN_CHECKMARK, RED_X):
-	blobs = bucket.list_blobs(prefix=workflow_name)
+def non_empty_check(snapshot, GREEN_CHECKMARK, RED_X):
 	not_empty_tests = {}
-	pattern = re.compile(rf"{workflow_name}/release/{release_version}/")
-	for blob in blobs:
-		if pattern.match(blob.name):
-			if blob.size <= 10:
-				logging.error(f"Found a file less than or equal to 10 bytes: [{blob.name}]")
-				not_empty_tests[blob.name] = f"{RED_X}"
-			else:
-				not_empty_tests[blob.name] = f"{GREEN_CHECKMARK}"
+	for blob in snapshot.blobs:
+		if blob.size <= 10:
+			logging.error(f"Found a file less than or equal to 10 bytes: [{blob.name}]")
+			not_empty_tests[blob.name] = f"{RED_X}"
+		else:
+			not_empty_tests[blob.name] = f"{GREEN_CHECKMARK}"
 	return not_empty_tests
 
 
+class ManifestFilenameIndex:
+	"""
+	Answers "is this basename contained in any MANIFEST filename?" without scanning every row per lookup.
+
+	Exact filenames and their basenames are hashed, so names the manifest lists are O(1) hits. Other
+	names are checked with the original "contained in" test, but only against candidate rows: split on
+	'/', '_', '-' and '.', every token of a name except its first and last has a separator on both
+	sides, so wherever the name occurs inside a filename those interior tokens are whole tokens of
+	that filename too. Rows are indexed by token, and a name is only compared with the rows holding
+	its rarest interior token (no rows means no match). Names without an interior token are compared
+	with every row. Results are cached.
+	"""
+
+	_SEPARATORS = re.compile(r"[/_\-.]")
+
+	def __init__(self, filenames):
+		self._filenames = list(dict.fromkeys(str(filename) for filename in filenames))
+		self._exact = set(self._filenames)
+		self._basenames = {filename.split("/")[-1] for filename in self._filenames}
+		self._rows_by_token = defaultdict(list)
+		for row, filename in enumerate(self._filenames):
+			for token in set(self._SEPARATORS.split(filename)):
+				self._rows_by_token[token].append(row)
+		self._cache = {}
+
+	def _candidate_rows(self, basename):
+		"""Rows that can contain `basename`: those holding its rarest interior token, or all rows."""
+		interior_tokens = self._SEPARATORS.split(basename)[1:-1]
+		if not interior_tokens:
+			return range(len(self._filenames))
+		return min((self._rows_by_token.get(token, ()) for token in interior_tokens), key=len)
+
+	def __contains__(self, basename):
+		if basename in self._exact or basename in self._basenames:
+			return True
+		if basename not in self._cache:
+			self._cache[basename] = any(basename in self._filenames[row] for row in self._candidate_rows(basename))
+		return self._cache[basename]
+
+
 def associated_metadata_check(combined_manifest_df, blob_list, GREEN_CHECKMARK, RED_X):
 	metadata_present_tests = {}
+	manifest_index = ManifestFilenameIndex(combined_manifest_df["filename"].dropna())
 	for file in blob_list:
 		if file.endswith("MANIFEST.tsv"):
 			metadata_present_tests[file] = "N/A"
 		else:
-			if any(file.split('/')[-1] in filename for filename in combined_manifest_df["filename"].tolist()):
+			if file.split('/')[-1] in manifest_index:
 				metadata_present_tests[file] = f"{GREEN_CHECKMARK}"
 			else:
 				logging.error(f"File does not have associated metadata and is absent from MANIFEST: [{file}]")
@@ -85,48 +226,56 @@ def associated_metadata_check(combined_manifest_df, blob_list, GREEN_CHECKMARK,
 	return metadata_present_tests
 
 
-def compare_blob_names(results, staging):
-	staging_blob_names = results[staging]["blob_names"]
-	curated_blob_names = results["curated"]["blob_names"]
-	staging_md5_hashes = results[staging]["md5_hashes"]
-	staging_bucket_name = next(iter(staging_md5_hashes)).bucket.name
-	same_files = ["N/A"]
-	new_files = ["N/A"]
-	deleted_files = ["N/A"]
-	if sorted(staging_blob_names) == sorted(curated_blob_names):
-		logging.info(f"The blob_names in '{staging}' are equal to those in 'curated.")
-	else:
-		logging.info(f"The blob_names in '{staging}' are not equal to those in 'curated'")
-		same_files = [file for file in staging_blob_names if file in curated_blob_names]
-		new_files = [f"gs://{staging_bucket_name}/{file}" for file in staging_blob_names if file not in curated_blob_names]
-		deleted_files = [f"gs://{staging_bucket_name}/{file}" for file in curated_blob_names if file not in staging_blob_names]
-		if new_files:
-			logging.info(f"New files in '{staging}': {new_files}")
-		if deleted_files:
-			logging.info(f"Deleted files in '{staging}': {deleted_files}")
-	return same_files, new_files, deleted_files
+@dataclass
+class ReleaseDiff:
+	"""
+	Staging vs. curated comparison consumed by markdown_generator.generate_markdown_report.
+
+	`same_files` holds blob names present on both sides; `new_files` / `deleted_files` hold gs://
+	paths; `modified_files` maps the gs:// path of a same-named file whose md5 differs to
+	{"staging_hash": ...}.
+	"""
+	same_files: list[str] = field(default_factory=list)
+	new_files: list[str] = field(default_factory=list)
+	deleted_files: list[str] = field(default_factory=list)
+	modified_files: dict[str, dict] = field(default_factory=dict)
 
 
-def compare_md5_hashes(results, staging, same_files):
+def diff_releases(results, staging):
+	"""Compute same/new/deleted/modified files between `staging` and "curated" with hashed name lookups."""
 	staging_md5_hashes = results[staging]["md5_hashes"]
 	curated_md5_hashes = results["curated"]["md5_hashes"]
-	staging_bucket_name = next(iter(staging_md5_hashes)).bucket.name
-	staging_file_hashes = {key.name: value for key, value in staging_md5_hashes.items()}
-	curated_file_hashes = {key.name: value for key, value in curated_md5_hashes.items()}
-	modified_files = {}
-	for file in same_files:
-		staging_hash = staging_file_hashes.get(file)
-		curated_hash = curated_file_hashes.get(file)
-		if staging_hash and curated_hash:
-			if staging_hash != curated_hash:
-				modified_files[f"gs://{staging_bucket_name}/{file}"] = {
-					"staging_hash": staging_hash
-				}
-				logging.info(f"Modified: {file}")
-	return modified_files
+	staging_bucket_name = results[staging]["snapshot"].bucket_name
+	diff = ReleaseDiff()
+	for file, staging_hash in staging_md5_hashes.items():
+		if file not in curated_md5_hashes:
+			diff.new_files.append(f"gs://{staging_bucket_name}/{file}")
+			continue
+		diff.same_files.append(file)
+		curated_hash = curated_md5_hashes[file]
+		if staging_hash and curated_hash and staging_hash != curated_hash:
+			diff.modified_files[f"gs://{staging_bucket_name}/{file}"] = {
+				"staging_hash": staging_hash
+			}
+			logging.info(f"Modified: {file}")
+	diff.deleted_files = [
+		f"gs://{staging_bucket_name}/{file}" for file in curated_md5_hashes if file not in staging_md5_hashes
+	]
+
+	if not diff.new_files and not diff.deleted_files:
+		logging.info(f"The blob_names in '{staging}' are equal to those in 'curated.")
+	else:
+		logging.info(f"The blob_names in '{staging}' are not equal to those in 'curated'")
+		if diff.new_files:
+			logging.info(f"New files in '{staging}': {diff.new_files}")
+		if diff.deleted_files:
+			logging.info(f"Deleted files in '{staging}': {diff.deleted_files}")
+	return diff
 
 
 __all__ = [
-    "list_gs_files", "read_manifest_files", "md5_check", "non_empty_check",
-    "associated_metadata_check", "compare_blob_names", "compare_md5_hashes",
+    "release_prefix", "list_release_versions", "get_combined_manifest_loc", "ReleaseBlob", "ReleaseSnapshot",
+    "MANIFEST_DOWNLOAD_WORKERS", "list_gs_files", "read_manifest_files", "md5_check", "non_empty_check",
+    "ManifestFilenameIndex", "associated_metadata_check", "ReleaseDiff", "diff_releases",
 ]
+
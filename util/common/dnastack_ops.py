@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""dnastack collections query wrapper with retries and a per-collection result cache.
+
+Runs `dnastack collections query -c <slug> <sql> -o csv` and returns the CSV text
+(header included, as dnastack prints it). Transient failures (timeouts, dropped
+connections, 429/5xx) are retried with exponential backoff; SQL errors are not.
+Successful results can be cached on disk keyed by slug + SQL, so repeated or
+re-run queries against the same collection are answered locally.
+
+Also runnable as a CLI so the bash reporting scripts can route their queries
+through it:
+	python3 dnastack_ops.py -c <slug> [--cache-dir <dir>] [--retries N] "<sql>"
+	python3 dnastack_ops.py -c <slug> --fingerprint
+"""
+
+import os
+import sys
+import time
+import hashlib
+import logging
+import argparse
+import subprocess
+
+
+DNASTACK_QUERY_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 2
+
+# stderr fragments that mark a failure worth retrying; anything else (e.g. a
+# missing table/column probed on purpose) fails immediately
+TRANSIENT_ERRORS = (
+	"timed out", "timeout", "connection", "temporarily unavailable",
+	"too many requests", "429", "500", "502", "503", "504",
+)
+
+
+def normalize_sql(sql):
+	"""Collapse whitespace so the same query written with different indentation shares a cache entry."""
+	return " ".join(sql.split())
+
+
+def _is_transient(stderr):
+	stderr = (stderr or "").lower()
+	return any(fragment in stderr for fragment in TRANSIENT_ERRORS)
+
+
+class QueryCache:
+	"""On-disk query results: <cache_dir>/<slug>/<sha256 of normalized SQL>.csv"""
+
+	def __init__(self, cache_dir):
+		self.cache_dir = cache_dir
+
+	def _path(self, slug, sql):
+		key = hashlib.sha256(normalize_sql(sql).encode("utf-8")).hexdigest()
+		return os.path.join(self.cache_dir, slug, f"{key}.csv")
+
+	def get(self, slug, sql):
+		path = self._path(slug, sql)
+		if not os.path.exists(path):
+			return None
+		with open(path) as f:
+			return f.read()
+
+	def put(self, slug, sql, result):
+		path = self._path(slug, sql)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		# Write then rename so concurrent readers never see a partial result
+		tmp_path = f"{path}.{os.getpid()}.tmp"
+		with open(tmp_path, "w") as f:
+			f.write(result)
+		os.replace(tmp_path, path)
+
+
+def query_collection(slug, sql, cache=None, retries=DNASTACK_QUERY_RETRIES):
+	"""
+	Run one SQL query against a CRN Cloud collection and return its CSV output.
+
+	Raises subprocess.CalledProcessError once retries are exhausted or on a non-transient error.
+	"""
+	if cache is not None:
+		result = cache.get(slug, sql)
+		if result is not None:
+			return result
+
+	command = ["dnastack", "collections", "query", "-c", slug, sql, "-o", "csv"]
+	for attempt in range(retries + 1):
+		process = subprocess.run(command, capture_output=True, text=True)
+		if process.returncode == 0:
+			break
+		if attempt == retries or not _is_transient(process.stderr):
+			raise subprocess.CalledProcessError(process.returncode, command, output=process.stdout, stderr=process.stderr)
+		delay = RETRY_BACKOFF_SECONDS * 2 ** attempt
+		logging.warning(f"[{slug}] Query failed (attempt {attempt + 1}/{retries + 1}); retrying in {delay}s: {process.stderr.strip()}")
+		time.sleep(delay)
+
+	if cache is not None:
+		cache.put(slug, sql, process.stdout)
+	return process.stdout
+
+
+def collection_fingerprint(slug, retries=DNASTACK_QUERY_RETRIES):
+	"""
+	Fingerprint a collection's current state: its tables, their columns and their row counts.
+
+	Never served from a QueryCache, so comparing against a fingerprint recorded by an earlier run
+	tells whether the collection changed since. Returns a 16-character hex digest.
+	"""
+	schema = slug.replace("-", "_")
+	columns = query_collection(
+		slug,
+		f"SELECT table_name, column_name FROM collections.information_schema.columns WHERE table_schema = '{schema}'",
+		retries=retries
+	)
+	column_lines = sorted(line.replace('"', "").strip() for line in columns.splitlines()[1:] if line.strip())
+	tables = sorted({line.split(",")[0] for line in column_lines})
+
+	row_count_lines = []
+	if tables:
+		# One round trip for every table's row count
+		row_counts = query_collection(
+			slug,
+			" UNION ALL ".join(
+				f"SELECT '{table}' AS table_name, COUNT(*) AS n_rows FROM \"collections\".\"{schema}\".\"{table}\""
+				for table in tables
+			),
+			retries=retries
+		)
+		row_count_lines = sorted(line.replace('"', "").strip() for line in row_counts.splitlines()[1:] if line.strip())
+
+	digest = hashlib.sha256("\n".join(column_lines + row_count_lines).encode("utf-8"))
+	return digest.hexdigest()[:16]
+
+
+def main(args):
+	if args.fingerprint:
+		try:
+			sys.stdout.write(f"{collection_fingerprint(args.collection, retries=args.retries)}\n")
+		except subprocess.CalledProcessError as e:
+			sys.stderr.write(e.stderr or "")
+			sys.exit(e.returncode or 1)
+		return
+
+	cache = QueryCache(args.cache_dir) if args.cache_dir else None
+	try:
+		result = query_collection(args.collection, args.sql, cache=cache, retries=args.retries)
+	except subprocess.CalledProcessError as e:
+		sys.stderr.write(e.stderr or "")
+		sys.exit(e.returncode or 1)
+	sys.stdout.write(result)
+
+
+__all__ = [
+    "DNASTACK_QUERY_RETRIES", "RETRY_BACKOFF_SECONDS", "TRANSIENT_ERRORS",
+    "normalize_sql", "QueryCache", "query_collection", "collection_fingerprint",
+]
+
+
+if __name__ == "__main__":
+	logging.basicConfig(
+		level=logging.INFO,
+		format="%(asctime)s - %(levelname)s - %(message)s"
+	)
+
+	parser = argparse.ArgumentParser(
+		description="Run a dnastack collections query (CSV output) with retries and an optional on-disk result cache."
+	)
+	parser.add_argument(
+		"-c",
+		"--collection",
+		type=str,
+		required=True,
+		help="Collection slug, e.g. prod-team-hafler-pmdbs-sn-rnaseq-pfc."
+	)
+	parser.add_argument(
+		"--cache-dir",
+		type=str,
+		required=False,
+		help="Directory to cache results in, keyed by collection slug + SQL (default: no cache)."
+	)
+	parser.add_argument(
+		"--retries",
+		type=int,
+		default=DNASTACK_QUERY_RETRIES,
+		required=False,
+		help=f"Retries for transient failures (default: {DNASTACK_QUERY_RETRIES})."
+	)
+	parser.add_argument(
+		"--fingerprint",
+		action="store_true",
+		required=False,
+		help="Print the collection's fingerprint (tables, columns and row counts; never cached) instead of running a query."
+	)
+	parser.add_argument(
+		"sql",
+		type=str,
+		nargs="?",
+		help="SQL query."
+	)
+
+	args = parser.parse_args()
+	if not args.fingerprint and not args.sql:
+		parser.error("a SQL query is required unless --fingerprint is given")
+	main(args)
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-"""General-purpose functions to parse file properties (e.g. size, extension)."""
+"""General-purpose functions to parse file properties (e.g. size, extension) and read metadata CSV tables."""
 
 import csv
+import io
 import os
 import re
 from pathlib import Path
@@ -10,6 +11,8 @@ from pathlib import Path
 _SUPPORTED_DELIMITERS = [",", ";", "\t", "|"]
 _ENCODINGS_TO_TRY = ("utf-8-sig", "utf-8", "cp1252", "latin-1")
 _DELIMITER_DETECTION_LINES = 50
+# Encodings tried when reading a metadata table's contents
+_TABLE_ENCODINGS = ("utf-8-sig", "utf-8", "latin-1")
 
 
 def detect_csv_delimiter(file_path: Path, num_lines: int = _DELIMITER_DETECTION_LINES) -> str:
@@ -39,17 +42,21 @@ def detect_csv_delimiter(file_path: Path, num_lines: int = _DELIMITER_DETECTION_
         raw = file_path.read_bytes()
     except Exception:
         return ","
+    return _detect_delimiter_in_text(_decode_bytes(raw, _ENCODINGS_TO_TRY)[0], num_lines)
 
-    decoded = None
-    for enc in _ENCODINGS_TO_TRY:
+
+def _decode_bytes(raw: bytes, encodings: tuple) -> tuple:
+    """Decode with the first encoding that works; (text, encoding), or a lossy UTF-8 decode with encoding None."""
+    for enc in encodings:
         try:
-            decoded = raw.decode(enc)
-            break
+            return raw.decode(enc), enc
         except UnicodeDecodeError:
             continue
-    if decoded is None:
-        decoded = raw.decode("utf-8", errors="ignore")
+    return raw.decode("utf-8", errors="ignore"), None
+
 
+def _detect_delimiter_in_text(decoded: str, num_lines: int = _DELIMITER_DETECTION_LINES) -> str:
+    """Delimiter scoring behind `detect_csv_delimiter`, on already-decoded text."""
     lines = [line for line in decoded.splitlines() if line.strip()]
     if not lines:
         return ","
@@ -112,6 +119,32 @@ def parse_file_size_to_bytes(size_str: str) -> int:
         return 0
 
 
+def format_size_bytes(size_bytes: int) -> str:
+    """
+    Format a byte count as a human-readable size string.
+
+    Uses the same units as `parse_file_size_to_bytes` (and gcloud's
+    --readable-sizes), so the two round-trip to within rounding.
+
+    Parameters
+    ----------
+    size_bytes : int
+        Size in bytes.
+
+    Returns
+    -------
+    str
+        Human-readable size string, e.g. '0B', '512B', '1.50kiB', '2.30MiB'.
+    """
+    if size_bytes < 1024:
+        return f"{size_bytes}B"
+    size = float(size_bytes)
+    for unit in ['kiB', 'MiB', 'GiB', 'TiB']:
+        size /= 1024
+        if size < 1024 or unit == 'TiB':
+            return f"{size:.2f}{unit}"
+
+
 def get_file_extension(filepath: str) -> str:
     """
     Extract the file extension, stripping compression layers.
@@ -143,7 +176,7 @@ def get_file_extension(filepath: str) -> str:
     return ext.lstrip('.') if ext else 'no_extension'
 
 
-def check_csv_rows(csv_path: Path, min_rows: int = 2) -> dict:
+def check_csv_rows(csv_path: Path, min_rows: int = 2, table: "MetadataTable" = None) -> dict:
     """
     Check whether a CSV file has at least `min_rows` rows (header + data).
 
@@ -155,6 +188,9 @@ def check_csv_rows(csv_path: Path, min_rows: int = 2) -> dict:
         Path to the CSV file.
     min_rows : int
         Minimum required row count.
+    table : MetadataTable, optional
+        Already-loaded table for `csv_path` (e.g. from a `MetadataTableCache`),
+        so its parsed records are reused instead of re-reading the file.
 
     Returns
     -------
@@ -164,15 +200,10 @@ def check_csv_rows(csv_path: Path, min_rows: int = 2) -> dict:
         status : str — 'valid', 'insufficient', or 'error'
         error : str or None
     """
-    delimiter = detect_csv_delimiter(csv_path)
+    if table is None:
+        table = MetadataTable(csv_path)
     try:
-        for encoding in ('utf-8', 'latin-1'):
-            try:
-                with open(csv_path, 'r', encoding=encoding) as f:
-                    row_count = sum(1 for _ in csv.reader(f, delimiter=delimiter))
-                break
-            except UnicodeDecodeError:
-                continue
+        row_count = len(table.records())
         return {
             'row_count': row_count,
             'rows': row_count,
@@ -182,3 +213,155 @@ def check_csv_rows(csv_path: Path, min_rows: int = 2) -> dict:
         }
     except Exception as e:
         return {'row_count': 0, 'rows': 0, 'has_data': False, 'status': 'error', 'error': str(e)}
+
+
+class MetadataTable:
+    """
+    One metadata CSV, read from disk and decoded once.
+
+    The delimiter, parsed records and pandas DataFrame are each computed on
+    first use and kept, so every validation stage reading the same table
+    shares one read and one parse.
+
+    Parameters
+    ----------
+    path : Path
+        Path to the CSV file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._raw = None
+        self._text = None
+        self._encoding = None
+        self._delimiter = None
+        self._records = None
+        self._frame = None
+
+    @property
+    def raw(self) -> bytes:
+        """File contents. Raises OSError if the file cannot be read."""
+        if self._raw is None:
+            self._raw = self.path.read_bytes()
+        return self._raw
+
+    def _decode(self):
+        if self._text is None:
+            self._text, self._encoding = _decode_bytes(self.raw, _TABLE_ENCODINGS)
+
+    @property
+    def text(self) -> str:
+        """Contents decoded with the first of utf-8-sig, utf-8, latin-1 that works."""
+        self._decode()
+        return self._text
+
+    @property
+    def encoding(self) -> str | None:
+        """Encoding `text` was decoded with."""
+        self._decode()
+        return self._encoding
+
+    @property
+    def delimiter(self) -> str:
+        """Delimiter as detected by `detect_csv_delimiter` (',' if unreadable)."""
+        if self._delimiter is None:
+            try:
+                # detect_csv_delimiter falls back to cp1252 before latin-1,
+                # so only UTF-8 text can be shared with `text`
+                if self.encoding == _TABLE_ENCODINGS[0]:
+                    decoded = self.text
+                else:
+                    decoded = _decode_bytes(self.raw, _ENCODINGS_TO_TRY)[0]
+                self._delimiter = _detect_delimiter_in_text(decoded)
+            except Exception:
+                self._delimiter = ","
+        return self._delimiter
+
+    def records(self) -> list:
+        """
+        All CSV records, blank lines included as empty lists (as `csv.reader`
+        yields them when reading the file in text mode).
+
+        Returns
+        -------
+        list of list of str
+        """
+        if self._records is None:
+            self._records = list(csv.reader(io.StringIO(self.text, newline=None), delimiter=self.delimiter))
+        return self._records
+
+    @property
+    def fieldnames(self) -> list | None:
+        """First record, as `csv.DictReader.fieldnames` reports it (None if empty)."""
+        records = self.records()
+        return records[0] if records else None
+
+    def dict_rows(self):
+        """
+        Yield the data records as dicts with `csv.DictReader` semantics: blank
+        lines are skipped, extra values go under the None key and missing
+        values are None.
+
+        Yields
+        ------
+        dict
+        """
+        fieldnames = self.fieldnames
+        if fieldnames is None:
+            return
+        n_fields = len(fieldnames)
+        for record in self._records[1:]:
+            if not record:
+                continue
+            row = dict(zip(fieldnames, record))
+            if n_fields < len(record):
+                row[None] = record[n_fields:]
+            elif n_fields > len(record):
+                for key in fieldnames[len(record):]:
+                    row[key] = None
+            yield row
+
+    def frame(self):
+        """
+        The table as a pandas DataFrame (`pd.read_csv` with the detected
+        delimiter). Parse errors are raised, not cached.
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        if self._frame is None:
+            import pandas as pd
+            self._frame = pd.read_csv(io.StringIO(self.text), sep=self.delimiter)
+        return self._frame
+
+
+class MetadataTableCache:
+    """
+    `MetadataTable`s keyed by path, so each metadata CSV is read and parsed
+    once per validation run however many stages look at it.
+
+    Files must not change while cached; rename or rewrite them (e.g.
+    `strip_metadata_suffixes`) before creating the cache.
+    """
+
+    def __init__(self):
+        self._tables = {}
+
+    def get(self, path: Path) -> MetadataTable:
+        """
+        Parameters
+        ----------
+        path : Path
+            Path to the CSV file.
+
+        Returns
+        -------
+        MetadataTable
+            The cached table for `path`, created on first request.
+        """
+        path = Path(path)
+        table = self._tables.get(path)
+        if table is None:
+            table = self._tables[path] = MetadataTable(path)
+        return table
@@ -4,12 +4,49 @@
 Thin wrappers around `gcloud storage ...` subprocess calls (copy/move/remove/
 rsync/list) plus the bucket permission and label operations used during data
 promotion. Also includes the small bucket/dataset name-parsing helpers.
+
+The copy/move/remove/rsync/list wrappers can instead run through a shared
+google.cloud.storage client (see storage_client_ops), selected per call with
+`backend="client"` or globally with set_default_backend() / the
+GCLOUD_OPS_BACKEND environment variable. The `gcloud` subprocess backend
+remains the default.
 """
 
+import os
 import json
 import logging
+import contextvars
 import subprocess
 import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+
+GCLOUD_BACKEND = "gcloud"
+CLIENT_BACKEND = "client"
+STORAGE_BACKENDS = (GCLOUD_BACKEND, CLIENT_BACKEND)
+
+_default_backend = os.environ.get("GCLOUD_OPS_BACKEND", GCLOUD_BACKEND)
+
+
+def set_default_backend(backend):
+	"""Select the backend used by gcopy/gmove/gremove/list_dirs/gsync/gsync_del when none is passed."""
+	global _default_backend
+	if backend not in STORAGE_BACKENDS:
+		raise ValueError(f"Invalid storage backend: [{backend}]. Must be one of {STORAGE_BACKENDS}")
+	_default_backend = backend
+
+
+def get_default_backend():
+	return _default_backend
+
+
+def _use_client_backend(backend):
+	backend = backend or _default_backend
+	if backend not in STORAGE_BACKENDS:
+		raise ValueError(f"Invalid storage backend: [{backend}]. Must be one of {STORAGE_BACKENDS}")
+	return backend == CLIENT_BACKEND
 
 
 def get_team_name(bucket: str) -> str:
@@ -106,18 +143,27 @@ def change_gg_storage_admin_to_read_write(bucket_name):
 		print(f"[INFO] Storage Object Creator and Viewer already granted to CRN Teams' permissions for [{bucket_name}] on Google Group")
 
 
-def list_dirs(bucket_name):
+def list_dirs(bucket_name, backend=None, billing_project=None):
+	if _use_client_backend(backend):
+		import storage_client_ops
+		return storage_client_ops.list_dir(bucket_name, billing_project=billing_project)
 	command = [
 		"gcloud",
 		"storage",
 		"ls",
 		bucket_name
 	]
+	if billing_project:
+		command.insert(3, f"--billing-project={billing_project}")
 	result = subprocess.run(command, check=True, capture_output=True, text=True)
 	return result.stdout
 
 
-def gcopy(source_path, destination_path, recursive=False):
+def gcopy(source_path, destination_path, recursive=False, backend=None, billing_project=None):
+	if _use_client_backend(backend):
+		import storage_client_ops
+		storage_client_ops.copy(source_path, destination_path, recursive=recursive, billing_project=billing_project)
+		return
 	command = [
 		"gcloud",
 		"storage",
@@ -127,6 +173,8 @@ def gcopy(source_path, destination_path, recursive=False):
 	]
 	if recursive:
 		command.insert(3, "--recursive")
+	if billing_project:
+		command.insert(3, f"--billing-project={billing_project}")
 	result = subprocess.run(command, check=True, capture_output=True, text=True)
 
 	# These if's are because gcloud returns important info in stderr (e.g. "Copying /path/to/file1 to gs://bucket/file1...") 
@@ -136,7 +184,108 @@ def gcopy(source_path, destination_path, recursive=False):
 	if result.stderr:
 		logging.info(result.stderr)
 
-def gmove(source_path, destination_path):
+# Default number of concurrent transfers run by gcopy_many
+GCOPY_MANY_WORKERS = 8
+
+
+@dataclass
+class CopyResult:
+	"""Outcome of one (source, destination) pair in gcopy_many; `error` is None on success."""
+	source: str
+	destination: str
+	error: str | None = None
+
+	@property
+	def ok(self):
+		return self.error is None
+
+
+def _submit_in_context(executor, fn, *args):
+	"""Submit `fn` to run in a copy of the caller's context, so contextvars (e.g. a per-dataset log context) carry over to the pool thread."""
+	return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def _gcopy_result(source_path, destination_path, backend, billing_project=None):
+	try:
+		gcopy(source_path, destination_path, backend=backend, billing_project=billing_project)
+	except subprocess.CalledProcessError as e:
+		return CopyResult(source_path, destination_path, (e.stderr or str(e)).strip())
+	except Exception as e:
+		return CopyResult(source_path, destination_path, str(e))
+	return CopyResult(source_path, destination_path)
+
+
+def _gcopy_batch(destination_dir, pairs, billing_project=None):
+	"""One `gcloud storage cp -I` for sources that keep their name in the same destination folder."""
+	command = [
+		"gcloud",
+		"storage",
+		"cp",
+		"--read-paths-from-stdin",
+		f"{destination_dir}/"
+	]
+	if billing_project:
+		command.insert(3, f"--billing-project={billing_project}")
+	sources = "\n".join(source for source, _ in pairs) + "\n"
+	try:
+		result = subprocess.run(command, input=sources, check=True, capture_output=True, text=True)
+	except subprocess.CalledProcessError:
+		# Retry one by one so each pair reports its own error
+		return [_gcopy_result(source, destination, GCLOUD_BACKEND, billing_project) for source, destination in pairs]
+	if result.stdout:
+		logging.info(result.stdout)
+	if result.stderr:
+		logging.info(result.stderr)
+	return [CopyResult(source, destination) for source, destination in pairs]
+
+
+def gcopy_many(pairs, max_workers=GCOPY_MANY_WORKERS, backend=None, billing_project=None):
+	"""
+	Copy many (source, destination) file pairs as one parallel transfer.
+
+	With the gcloud backend, pairs that keep the source file name and share a destination folder
+	are sent through a single `gcloud storage cp -I` process; with the client backend every pair
+	is copied through the shared storage client. Up to `max_workers` transfers run at once.
+	Set `billing_project` to copy out of requester-pays buckets.
+
+	Returns one CopyResult per pair, in input order. Failures are reported per pair instead of
+	raised, so callers decide whether a partial transfer is fatal.
+	"""
+	pairs = [(str(source), str(destination)) for source, destination in pairs]
+	if _use_client_backend(backend):
+		with ThreadPoolExecutor(max_workers=max_workers) as executor:
+			futures = [_submit_in_context(executor, _gcopy_result, *pair, CLIENT_BACKEND, billing_project) for pair in pairs]
+			return [future.result() for future in futures]
+
+	batches = defaultdict(list)
+	for source, destination in pairs:
+		destination_dir, _, destination_name = destination.rpartition("/")
+		if destination_name == os.path.basename(source.rstrip("/")):
+			batches[destination_dir].append((source, destination))
+		else:
+			batches[None].append((source, destination))
+	jobs = [[pair] for pair in batches.pop(None, [])] + list(batches.items())
+
+	def run_job(job):
+		if isinstance(job, tuple):
+			return _gcopy_batch(*job, billing_project)
+		return [_gcopy_result(*job[0], GCLOUD_BACKEND, billing_project)]
+
+	with ThreadPoolExecutor(max_workers=max_workers) as executor:
+		futures = [_submit_in_context(executor, run_job, job) for job in jobs]
+		results = {
+			(result.source, result.destination): result
+			for future in futures
+			for result in future.result()
+		}
+	return [results[pair] for pair in pairs]
+
+
+def gmove(source_path, destination_path, backend=None, billing_project=None):
+	if _use_client_backend(backend):
+		import storage_client_ops
+		storage_client_ops.move(source_path, destination_path, billing_project=billing_project)
+		return
 	command = [
 		"gcloud",
 		"storage",
@@ -144,6 +293,8 @@ def gmove(source_path, destination_path):
 		source_path,
 		destination_path
 	]
+	if billing_project:
+		command.insert(3, f"--billing-project={billing_project}")
 	result = subprocess.run(command, check=True, capture_output=True, text=True)
 	if result.stdout:
 		logging.info(result.stdout)
@@ -151,13 +302,20 @@ def gmove(source_path, destination_path):
 		logging.info(result.stderr)
 
 
-def gremove(destination_path):
+def gremove(destination_path, backend=None, billing_project=None):
+	if _use_client_backend(backend):
+		import storage_client_ops
+		if storage_client_ops.remove(destination_path, billing_project=billing_project) == 0:
+			logging.info(f"No files found at {destination_path}; skipping deletion.")
+		return
 	command = [
 		"gcloud",
 		"storage",
 		"rm",
 		destination_path
 	]
+	if billing_project:
+		command.insert(3, f"--billing-project={billing_project}")
 	try:
 		result = subprocess.run(command, check=True, capture_output=True, text=True)
 	except subprocess.CalledProcessError:
@@ -169,7 +327,11 @@ def gremove(destination_path):
 		logging.info(result.stderr)
 
 
-def gsync(source_path, destination_path, dry_run):
+def gsync(source_path, destination_path, dry_run, backend=None, billing_project=None):
+	if _use_client_backend(backend):
+		import storage_client_ops
+		storage_client_ops.rsync(source_path, destination_path, dry_run, billing_project=billing_project)
+		return
 	command = [
 		"gcloud",
 		"storage",
@@ -180,6 +342,8 @@ def gsync(source_path, destination_path, dry_run):
 	]
 	if dry_run:
 		command.insert(4, "--dry-run")
+	if billing_project:
+		command.insert(3, f"--billing-project={billing_project}")
 	result = subprocess.run(command, check=True, capture_output=True, text=True)
 	if result.stdout:
 		logging.info(result.stdout)
@@ -187,7 +351,11 @@ def gsync(source_path, destination_path, dry_run):
 		logging.info(result.stderr)
 
 
-def gsync_del(source_path, destination_path, dry_run):
+def gsync_del(source_path, destination_path, dry_run, backend=None, billing_project=None):
+	if _use_client_backend(backend):
+		import storage_client_ops
+		storage_client_ops.rsync(source_path, destination_path, dry_run, delete_unmatched=True, billing_project=billing_project)
+		return
 	command = [
 		"gcloud",
 		"storage",
@@ -199,6 +367,8 @@ def gsync_del(source_path, destination_path, dry_run):
 	]
 	if dry_run:
 		command.insert(4, "--dry-run")
+	if billing_project:
+		command.insert(3, f"--billing-project={billing_project}")
 	result = subprocess.run(command, check=True, capture_output=True, text=True)
 	if result.stdout:
 		logging.info(result.stdout)
@@ -226,9 +396,11 @@ def add_verily_read_access(bucket_name):
 
 
 __all__ = [
+    "GCLOUD_BACKEND", "CLIENT_BACKEND", "STORAGE_BACKENDS",
+    "set_default_backend", "get_default_backend",
     "get_team_name", "strip_team_prefix", "run_command",
     "remove_internal_qc_label", "check_admin_binding",
     "change_gg_storage_admin_to_read_write", "list_dirs",
-    "gcopy", "gmove", "gremove", "gsync", "gsync_del",
+    "gcopy", "GCOPY_MANY_WORKERS", "CopyResult", "gcopy_many", "gmove", "gremove", "gsync", "gsync_del",
     "add_verily_read_access",
 ]
@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
 
-import subprocess
+import gzip
 from datetime import datetime
 from packaging import version
-from data_integrity import compare_blob_names, compare_md5_hashes
+from data_integrity import diff_releases, get_combined_manifest_loc
 
 
-def get_combined_manifest_loc(path):
-	command = f"gcloud storage ls {path} | sort | tail -1"
-	file_loc = subprocess.check_output(command, shell=True, text=True, stderr=subprocess.PIPE)
-	return file_loc.strip()
+def _write_rows(file, rows, empty_row):
+	"""Write one table row per line; write `empty_row` if `rows` yields nothing."""
+	wrote_row = False
+	for row in rows:
+		file.write(f"{row}\n")
+		wrote_row = True
+	if not wrote_row:
+		file.write(f"{empty_row}\n")
 
 
 def generate_markdown_report(
@@ -23,8 +27,16 @@ def generate_markdown_report(
 	not_empty_tests,
 	metadata_present_tests,
 	test_boolean,
-	test_result
+	test_result,
+	compress=False
 ):
+	"""
+	Write the data promotion report section by section, streaming table rows to the file.
+
+	Row-heavy tables (new/modified/deleted files and per-file test results) are written one row at
+	a time so memory stays flat on large releases. If `compress` is True the report is gzipped.
+	Returns the path of the written report.
+	"""
 	staging_bucket = f"gs://asap-{staging}-{dataset_id}"
 	production_bucket = f"gs://asap-curated-{dataset_id}"
 
@@ -72,42 +84,49 @@ def generate_markdown_report(
 		production_sample_loc = f"`{file_info["curated"]["sample_list_loc"][0]}`"
 
 		# Compare different envs
-		same_files, new_files, deleted_files = compare_blob_names(file_info, staging)
-		if new_files:
-			new_files_rows = "\n".join(f"| {filename} |" for filename in new_files)
-		else:
-			new_files_rows = "| N/A |"
-		if deleted_files:
-			deleted_files_rows = "\n".join(f"| {filename} |" for filename in deleted_files)
-		else:
-			deleted_files_rows = "| N/A |"
-		modified_files = compare_md5_hashes(file_info, staging, same_files)
-		if same_files == ["N/A"]:
-			modified_files_rows = "| N/A | N/A |"
+		release_diff = diff_releases(file_info, staging)
+		new_files_rows = (f"| {filename} |" for filename in release_diff.new_files)
+		deleted_files_rows = (f"| {filename} |" for filename in release_diff.deleted_files)
+		modified_files_rows = (
+			f"| {filename} | {info['staging_hash']} |"
+			for filename, info in release_diff.modified_files.items()
+		)
+		# The Modified table only gets an N/A row when staging and curated list the same files;
+		# otherwise an empty table is left empty, as in earlier reports
+		if release_diff.new_files or release_diff.deleted_files:
+			modified_files_empty_row = ""
 		else:
-			modified_files_rows = "\n".join(f"| {filename} | {info['staging_hash']} |" 
-									for filename, info in modified_files.items())
+			modified_files_empty_row = "| N/A | N/A |"
 	else:
 		production_timestamps = "N/A"
 		production_workflow_info = "N/A"
 		production_sample_loc = "N/A"
 
-		new_files_rows = "\n".join(f"| {filename} |" for filename in file_info[staging]["gs_files"])
-		deleted_files_rows = "| N/A |"
-		modified_files_rows = "| N/A | N/A |"
+		new_files_rows = (f"| {filename} |" for filename in file_info[staging]["gs_files"])
+		deleted_files_rows = ()
+		modified_files_rows = ()
+		modified_files_empty_row = "| N/A | N/A |"
 
-	data_integrity_test_rows = "\n".join(
-			f"| {file} | {timestamp} | {not_empty_tests[file]} | {metadata_present_tests[file]} |"
-			for file in not_empty_tests
-		)
-	
-	previous_manifest_loc = get_combined_manifest_loc(f"{staging_bucket}/{workflow}/release/**")
+	data_integrity_test_rows = (
+		f"| {file} | {timestamp} | {not_empty_tests[file]} | {metadata_present_tests[file]} |"
+		for file in not_empty_tests
+	)
+
+	previous_manifest_loc = get_combined_manifest_loc(file_info[staging]["snapshot"].bucket, workflow)
 	if previous_manifest_loc == "":
 		previous_manifest_loc = "N/A"
 	else:
 		previous_manifest_loc = f"`{previous_manifest_loc}`"
 
-	markdown_content = f"""# Info
+	report_path = f"{dataset_id_underscore}_data_promotion_report.md"
+	if compress:
+		report_path = f"{report_path}.gz"
+		report_file = gzip.open(report_path, "wt", encoding="utf-8")
+	else:
+		report_file = open(report_path, "w")
+
+	with report_file as file:
+		file.write(f"""# Info
 ## Initial environment
 **Environment:** [{staging}]
 
@@ -154,18 +173,21 @@ def generate_markdown_report(
 ## New (i.e. only in staging)
 | filename |
 |---------|
-{new_files_rows}
-
+""")
+		_write_rows(file, new_files_rows, "| N/A |")
+		file.write("""
 ## Modified
 | filename | hash (md5) |
 |---------|---------|
-{modified_files_rows}
-
+""")
+		_write_rows(file, modified_files_rows, modified_files_empty_row)
+		file.write("""
 ## Deleted (i.e. only in prod)
 | filename |
 |---------|
-{deleted_files_rows}
-
+""")
+		_write_rows(file, deleted_files_rows, "| N/A |")
+		file.write(f"""
 
 # File tests
 ### Table 2: Summary of data integrity tests results
@@ -178,14 +200,13 @@ Summarizes the results of all data integrity tests on all files and when the tes
 Individual data integrity test results for each file (a comprehensive variation of [Table 2](#table-2-summary-of-data-integrity-tests-results)) and when the tests were run. Tests involve checking if files are not empty and have an associated metadata (more details in [Table 1](#table-1-definitions)). All tests for all files must pass in order for data to be promoted.
 | filename | timestamp | not empty test | metadata present test |
 |---------|---------|---------|-------------|
-{data_integrity_test_rows}
-
+""")
+		_write_rows(file, data_integrity_test_rows, "")
+		file.write(f"""
 
 # Combined manifest file locations
 **New manifest:** `{staging_bucket}/{workflow}/release/{release_version}/workflow_metadata/{timestamp}/MANIFEST.tsv`
 
 **Previous manifest:** {previous_manifest_loc}
-"""
-
-	with open(f"{dataset_id_underscore}_data_promotion_report.md", "w") as file:
-		file.write(markdown_content)
+""")
+	return report_path
@@ -4,22 +4,63 @@
 Pulls the live Releases Google Sheet as the single source of truth and exposes
 the derived bucket lists and ordered category constants, plus the slug-based
 classifiers used when Sheet metadata isn't available (e.g. internal QC datasets).
+
+The Sheet is only fetched on first access to one of the derived tables, and is
+snapshotted to RELEASES_CACHE_PATH so later runs (or offline runs) reuse it.
 """
 
 import os
+import re
+import json
+import time
 import logging
+import threading
+from functools import lru_cache
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 
 
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
 
+# On-disk snapshot of the Releases Sheet, reused for RELEASES_CACHE_TTL seconds
+RELEASES_CACHE_PATH = os.environ.get(
+	"RELEASES_CACHE_PATH",
+	os.path.expanduser("~/.cache/wf-common/releases_src.json")
+)
+RELEASES_CACHE_TTL = int(os.environ.get("RELEASES_CACHE_TTL", 6 * 60 * 60))
+
+# Offline mode never contacts Google Sheets and uses the snapshot whatever its age
+_offline = os.environ.get("RELEASES_OFFLINE", "").lower() in ("1", "true", "yes")
+
+# Oldest snapshot get_release_tables() will reuse, in seconds; None means RELEASES_CACHE_TTL
+_max_age = None
+
+_release_tables = None
+_release_tables_lock = threading.Lock()
+
+
+def set_offline(offline=True):
+	global _offline
+	_offline = offline
+
+
+def set_cache_max_age(max_age=None):
+	"""
+	Set the oldest Releases Sheet snapshot get_release_tables() will reuse, in seconds. 0 always
+	fetches the live Sheet (unless offline); None restores the RELEASES_CACHE_TTL default.
+	"""
+	global _max_age
+	_max_age = max_age
+
+
 def get_releases_df(
 	sheet_id: str = "1Qx4W3EsGQwRHXKtDd6jBnEyPGsuhxB8YCVdgJ-Mn6Hs",
 	tab_name: str = "Releases_src",
 	credentials_path: str = os.path.expanduser("~/.config/gspread/credentials.json")
 ) -> pd.DataFrame:
+	# Imported here so that offline/cached use does not need gspread installed
+	import gspread
+	from google.oauth2.service_account import Credentials
+
 	if not os.path.exists(credentials_path):
 		raise FileNotFoundError(f"Credentials file not found: {credentials_path}; look at README")
 	creds = Credentials.from_service_account_file(credentials_path, scopes=SCOPES)
@@ -27,33 +68,95 @@ def get_releases_df(
 	ws = gc.open_by_key(sheet_id).worksheet(tab_name)
 	return pd.DataFrame(ws.get_all_records())
 
-releases_df = get_releases_df()
-releases_df["raw_buckets"] = "gs://asap-raw-" + releases_df["dataset_id"]
-releases_df["dev_buckets"] = "gs://asap-dev-" + releases_df["dataset_id"]
-
-ALL_TEAMS = releases_df["team_id"].unique().tolist()
-
-## Minor and Major Release that includes pipeline/curated outputs
-### The latest_workflow_version column is being used to infer datasets with pipeline outputs
-unembargoed_dev_buckets_and_workflow_version_outputs = (
-	releases_df[
-		releases_df["latest_workflow_version"].str.startswith("v", na=False)
-	]
-	.sort_values("latest_workflow_version")
-	.drop_duplicates(subset="dev_buckets", keep="last")
-	.set_index("dev_buckets")["latest_workflow_version"]
-	.to_dict()
-)
-## Urgent and Minor Release or platforming exercise during a Major Release
-completed_platforming_raw_buckets = (
-	releases_df[
-		~releases_df["latest_workflow_version"].str.startswith("v", na=False)
-	]["raw_buckets"]
-	.drop_duplicates()
-	.tolist()
+
+def load_releases_df(
+	cache_path: str = RELEASES_CACHE_PATH,
+	max_age: int = None,
+	offline: bool = None
+) -> pd.DataFrame:
+	"""
+	Return the Releases Sheet, served from the on-disk snapshot at `cache_path` when it is younger
+	than `max_age` seconds (default RELEASES_CACHE_TTL), otherwise fetched with get_releases_df()
+	and written back to the snapshot. In offline mode the snapshot is used regardless of its age.
+	"""
+	max_age = RELEASES_CACHE_TTL if max_age is None else max_age
+	offline = _offline if offline is None else offline
+
+	if os.path.exists(cache_path):
+		age = time.time() - os.path.getmtime(cache_path)
+		if offline or age <= max_age:
+			logging.info(f"Using Releases Sheet snapshot [{cache_path}] ({age / 60:.0f} min old)")
+			with open(cache_path) as f:
+				return pd.DataFrame(json.load(f))
+	if offline:
+		raise FileNotFoundError(f"Offline mode requested but no Releases Sheet snapshot found: {cache_path}")
+
+	releases_df = get_releases_df()
+	os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+	# Write then rename so concurrent readers never see a partial snapshot
+	tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+	with open(tmp_path, "w") as f:
+		json.dump(releases_df.to_dict(orient="records"), f, default=str)
+	os.replace(tmp_path, cache_path)
+	return releases_df
+
+
+def _build_release_tables(releases_df):
+	releases_df["raw_buckets"] = "gs://asap-raw-" + releases_df["dataset_id"]
+	releases_df["dev_buckets"] = "gs://asap-dev-" + releases_df["dataset_id"]
+
+	return {
+		"releases_df": releases_df,
+		"ALL_TEAMS": releases_df["team_id"].unique().tolist(),
+		## Minor and Major Release that includes pipeline/curated outputs
+		### The latest_workflow_version column is being used to infer datasets with pipeline outputs
+		"unembargoed_dev_buckets_and_workflow_version_outputs": (
+			releases_df[
+				releases_df["latest_workflow_version"].str.startswith("v", na=False)
+			]
+			.sort_values("latest_workflow_version")
+			.drop_duplicates(subset="dev_buckets", keep="last")
+			.set_index("dev_buckets")["latest_workflow_version"]
+			.to_dict()
+		),
+		## Urgent and Minor Release or platforming exercise during a Major Release
+		"completed_platforming_raw_buckets": (
+			releases_df[
+				~releases_df["latest_workflow_version"].str.startswith("v", na=False)
+			]["raw_buckets"]
+			.drop_duplicates()
+			.tolist()
+		),
+	}
+
+
+def get_release_tables():
+	"""Load the Releases Sheet and its derived bucket lists once per process, on first use."""
+	global _release_tables
+	with _release_tables_lock:
+		if _release_tables is None:
+			_release_tables = _build_release_tables(load_releases_df(max_age=_max_age))
+	return _release_tables
+
+
+RELEASE_TABLES = (
+	"releases_df",
+	"ALL_TEAMS",
+	"unembargoed_dev_buckets_and_workflow_version_outputs",
+	"completed_platforming_raw_buckets",
 )
 
 
+def __getattr__(name):
+	# releases_df, ALL_TEAMS, unembargoed_dev_buckets_and_workflow_version_outputs and
+	# completed_platforming_raw_buckets are loaded lazily so importing this module
+	# (e.g. for the classifiers or --help) does not fetch the Releases Sheet. They are
+	# left out of __all__ so `from release_ops import *` does not fetch it either.
+	if name in RELEASE_TABLES:
+		return get_release_tables()[name]
+	raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 ######################################################################
 ##### SLUG CLASSIFIERS AND ORDERED CATEGORY LISTS ####################
 ######################################################################
@@ -104,66 +207,116 @@ def team_from_slug(slug):
 	return "unknown"
 
 
-def classify_assay(value):
-	"""Map an assay value (free-text Releases-Sheet `assay`, or a dataset slug)
-	to an entry in ASSAY_ORDER. Returns None if no pattern matches — callers
-	decide their own fallback (e.g. 'Unclassified').
+def _rule(category, contains=(), endswith=(), equals=()):
+	"""One classifier rule compiled to a single alternation regex over the lowercased value."""
+	alternatives = (
+		[re.escape(x) for x in contains] +
+		[re.escape(x) + r"\Z" for x in endswith] +
+		[r"\A" + re.escape(x) + r"\Z" for x in equals]
+	)
+	return category, re.compile("|".join(alternatives))
 
-	The patterns cover both Releases-Sheet conventions (snake_case, free-text
-	like 'Bulk_RNA_Seq', 'mass spec') and slug conventions (kebab-case like
-	'sc-rnaseq', 'ms-mb-plasma'). Order matters: more specific patterns are
-	checked before more general ones."""
-	s = str(value).lower()
 
+def _first_match(rules, s):
+	for category, pattern in rules:
+		if pattern.search(s):
+			return category
+	return None
+
+
+# Each classifier is an ordered rule list: the first rule that matches wins, so
+# more specific rules must come before more general ones.
+_ASSAY_RULES = [
 	# ATAC-seq first — broader sc/sn would otherwise capture sc_atac/sn_atac
-	if any(x in s for x in [
+	_rule("sc/snATAC-seq", contains=[
 		"sn-atacseq", "sc-atacseq", "snatacseq", "scatacseq",
 		"sc_atac", "sn_atac", "scatac", "snatac",
 		"sc-atac", "sn-atac", "atacseq", "atac_seq", "atac-seq",
-	]):
-		return "sc/snATAC-seq"
-
+	]),
 	# Multiome (paired RNA+ATAC, e.g. 10x Multiome) — checked before sc/sn RNA-seq
 	# so the multimodal/multiome keyword takes precedence over a generic sc-/sn- match
-	if any(x in s for x in ["multimodal", "multiome", "multiomic"]):
-		return "sc/sn Multiome"
-
+	_rule("sc/sn Multiome", contains=["multimodal", "multiome", "multiomic"]),
 	# sc/sn RNA-seq — covers both kebab-case slugs and snake_case Sheet values
-	if any(x in s for x in [
+	_rule("sc/snRNA-seq", contains=[
 		"sn-rnaseq", "sc-rnaseq", "scrnaseq", "snrnaseq",
 		"single-cell", "single-nucleus", "single_cell", "single_nucleus",
 		"scrna", "snrna", "sc-rna", "sn-rna",
 		"sc_", "sn_",
-	]):
-		return "sc/snRNA-seq"
-
-	if "bulk" in s:
-		return "Bulk RNA-seq"
-
-	if any(x in s for x in ["spatial", "visium", "geomx", "cosmx", "xenium", "nanostring"]):
-		return "Spatial Transcriptomics"
-
+	]),
+	_rule("Bulk RNA-seq", contains=["bulk"]),
+	_rule("Spatial Transcriptomics", contains=["spatial", "visium", "geomx", "cosmx", "xenium", "nanostring"]),
 	# Mass-spec assays — tighten ms-p / ms-mb / ms-l patterns so they don't collide.
 	# Bare `ms-p` is allowed when it's the whole value (e.g. Sheet input "ms-p")
 	# or at the end of a slug; the slug-tightened `ms-p-` / `ms-p_` handles
 	# embedded positions.
-	if (any(x in s for x in ["ms-p-", "ms-p_", "proteom", "mass-spec", "mass_spec", "mass spec"])
-			or s.endswith("ms-p") or s == "ms-p"):
-		return "Proteomics"
-	if any(x in s for x in ["ms-mb-", "ms-mb_", "metabolom"]) or s.endswith("ms-mb") or s == "ms-mb":
-		return "Metabolomics"
-	if any(x in s for x in ["ms-l-", "ms-l_", "lipidom"]) or s.endswith("ms-l") or s == "ms-l":
-		return "Lipidomics"
-
+	_rule("Proteomics", contains=["ms-p-", "ms-p_", "proteom", "mass-spec", "mass_spec", "mass spec"], endswith=["ms-p"]),
+	_rule("Metabolomics", contains=["ms-mb-", "ms-mb_", "metabolom"], endswith=["ms-mb"]),
+	_rule("Lipidomics", contains=["ms-l-", "ms-l_", "lipidom"], endswith=["ms-l"]),
 	# WGS before Genetics — Genetics is the catch-all for genotyping/SNP/array data
-	if any(x in s for x in ["wgs", "whole-genome", "whole_genome"]):
-		return "WGS"
-	if any(x in s for x in ["genetic", "genotyp", "gwas", "snp", "variant"]):
-		return "Genetics"
-	if any(x in s for x in ["metagenom", "shotgun", "microbiome", "16s"]):
-		return "Metagenomics"
+	_rule("WGS", contains=["wgs", "whole-genome", "whole_genome"]),
+	_rule("Genetics", contains=["genetic", "genotyp", "gwas", "snp", "variant"]),
+	_rule("Metagenomics", contains=["metagenom", "shotgun", "microbiome", "16s"]),
+]
+
+_ORGANISM_RULES = [
+	# Human keywords (slug-side: pmdbs; Sheet-side: human, homo)
+	_rule("Human", contains=["human", "homo", "pmdbs"]),
+	# MEF first — must come before generic mouse check so it doesn't get
+	# swallowed by a slug that happens to contain 'mef' but not 'mouse'
+	_rule("Mouse", contains=["mef"]),
+	_rule("Mouse", contains=["mouse", "mus", "sulzer-fecal-metagenome-fp-spf"]),
+	# Cell-line / in-vitro datasets — assume Human (values that also say
+	# mouse were already matched by the rule above)
+	_rule("Human", contains=["invitro", "ipsc", "hek"]),
+]
+
+_SOURCE_RULES = [
+	# MEF = mouse embryonic fibroblast → must come before generic cell-line check
+	_rule("Embryonic fibroblast", contains=["mef", "fibroblast", "embryon"]),
+	_rule("Brain tissue", contains=[
+		"brain", "pmdbs", "postmortem", "midbrain", "striatum", "cortex",
+		"substantia-nigra", "substantia nigra",
+		"hippocampus", "cerebellum", "neural",
+	]),
+	_rule("Gastrointestinal", contains=["colon", "gastro", "intestin", "gi-tract", "gi tract", "gut"]),
+	# Fecal: handles both Human Fecal and Mouse Fecal
+	_rule("Fecal", contains=["fecal", "stool", "feces", "microbiome", "metagenom"]),
+	_rule("Liver tissue", contains=["liver"]),
+	_rule("Lung tissue", contains=["lung"]),
+	_rule("Kidney tissue", contains=["kidney", "renal"]),
+	_rule("Plasma", contains=["plasma", "serum", "-blood-"], endswith=["-blood"], equals=["blood"]),
+	_rule("Cell lines", contains=[
+		"cell line", "cell-line", "invitro", "in vitro", "ipsc", "hek",
+		"neuronal cell", "hesc", "hpsc",
+	]),
+]
 
-	return None
+
+@lru_cache(maxsize=None)
+def _classify_assay(s):
+	return _first_match(_ASSAY_RULES, s)
+
+
+@lru_cache(maxsize=None)
+def _classify_organism(s):
+	return _first_match(_ORGANISM_RULES, s)
+
+
+@lru_cache(maxsize=None)
+def _classify_source(s):
+	return _first_match(_SOURCE_RULES, s)
+
+
+def classify_assay(value):
+	"""Map an assay value (free-text Releases-Sheet `assay`, or a dataset slug)
+	to an entry in ASSAY_ORDER. Returns None if no pattern matches — callers
+	decide their own fallback (e.g. 'Unclassified').
+
+	The patterns cover both Releases-Sheet conventions (snake_case, free-text
+	like 'Bulk_RNA_Seq', 'mass spec') and slug conventions (kebab-case like
+	'sc-rnaseq', 'ms-mb-plasma'). Order matters: more specific patterns are
+	checked before more general ones (see _ASSAY_RULES)."""
+	return _classify_assay(str(value).lower())
 
 
 def classify_organism(value):
@@ -172,22 +325,8 @@ def classify_organism(value):
 
 	Cell-line / in-vitro values default to Human unless the input also says
 	'mouse' (so a slug like prod-team-alessi-mefs-... resolves to Mouse via
-	the MEF check below)."""
-	s = str(value).lower()
-	# Human keywords (slug-side: pmdbs; Sheet-side: human, homo)
-	if any(x in s for x in ["human", "homo", "pmdbs"]):
-		return "Human"
-	# MEF first — must come before generic mouse check so it doesn't get
-	# swallowed by a slug that happens to contain 'mef' but not 'mouse'
-	if "mef" in s or "mefs" in s:
-		return "Mouse"
-	if any(x in s for x in ["mouse", "mus", "sulzer-fecal-metagenome-fp-spf"]):
-		return "Mouse"
-	# Cell-line / in-vitro datasets — assume Human unless the value also
-	# says mouse (caller decides further disambiguation if needed)
-	if any(x in s for x in ["invitro", "ipsc", "hek"]):
-		return "Human" if "mouse" not in s else "Mouse"
-	return None
+	the MEF rule)."""
+	return _classify_organism(str(value).lower())
 
 
 def classify_source(value, organism=""):
@@ -203,44 +342,14 @@ def classify_source(value, organism=""):
 	When called from the Releases-Sheet path, pass the organism so Fecal can
 	be split by Human/Mouse appropriately (currently both still map to 'Fecal',
 	but the organism arg is preserved for future disambiguation needs)."""
-	s = str(value).lower()
-	o = str(organism).lower()
+	return _classify_source(str(value).lower())
 
-	# MEF = mouse embryonic fibroblast → must come before generic cell-line check
-	if "mef" in s or "fibroblast" in s or "embryon" in s:
-		return "Embryonic fibroblast"
 
-	if any(x in s for x in [
-		"brain", "pmdbs", "postmortem", "midbrain", "striatum", "cortex",
-		"substantia-nigra", "substantia nigra",
-		"hippocampus", "cerebellum", "neural",
-	]):
-		return "Brain tissue"
-
-	if any(x in s for x in ["colon", "gastro", "intestin", "gi-tract", "gi tract", "gut"]):
-		return "Gastrointestinal"
-
-	# Fecal: handles both Human Fecal and Mouse Fecal. The organism arg lets
-	# callers route to bucket-specific behavior later; for now both return Fecal.
-	if any(x in s for x in ["fecal", "stool", "feces", "microbiome", "metagenom"]):
-		return "Fecal"
-
-	if "liver" in s:
-		return "Liver tissue"
-	if "lung" in s:
-		return "Lung tissue"
-	if "kidney" in s or "renal" in s:
-		return "Kidney tissue"
-	if any(x in s for x in ["plasma", "serum"]) or "-blood-" in s or s.endswith("-blood") or s == "blood":
-		return "Plasma"
-
-	if any(x in s for x in [
-		"cell line", "cell-line", "invitro", "in vitro", "ipsc", "hek",
-		"neuronal cell", "hesc", "hpsc",
-	]):
-		return "Cell lines"
-
-	return None
+def classify_series(values, classifier):
+	"""Classify a pandas Series with one of the classifiers above, calling it
+	once per distinct value instead of once per row."""
+	uniques = pd.unique(values)
+	return values.map(dict(zip(uniques, map(classifier, uniques))))
 
 
 embargoed_dev_buckets = [
@@ -254,15 +363,14 @@ embargoed_dev_buckets = [
 
 def list_teams():
 	logging.info("Available teams:")
-	for team in ALL_TEAMS:
+	for team in get_release_tables()["ALL_TEAMS"]:
 		logging.info(team)
 
 
 __all__ = [
-    "SCOPES", "get_releases_df", "releases_df", "ALL_TEAMS",
-    "unembargoed_dev_buckets_and_workflow_version_outputs",
-    "completed_platforming_raw_buckets",
+    "SCOPES", "RELEASES_CACHE_PATH", "RELEASES_CACHE_TTL", "set_offline", "set_cache_max_age",
+    "get_releases_df", "load_releases_df", "get_release_tables",
     "ASSAY_ORDER", "HUMAN_SOURCES_ORDER", "MOUSE_SOURCES_ORDER",
-    "team_from_slug", "classify_assay", "classify_organism", "classify_source",
+    "team_from_slug", "classify_assay", "classify_organism", "classify_source", "classify_series",
     "embargoed_dev_buckets", "list_teams",
 ]
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""google.cloud.storage implementations of the gcloud_ops transfer helpers.
+
+Backs gcloud_ops.gcopy / gmove / gremove / list_dirs / gsync / gsync_del when the
+"client" backend is selected: a single long-lived storage.Client with a pooled
+HTTP session replaces one `gcloud` process per call. Paths use the same
+gs://bucket/name and local-path forms as the CLI wrappers.
+"""
+
+import os
+import base64
+import fnmatch
+import hashlib
+import logging
+import subprocess
+import threading
+
+import google.auth
+from google.api_core.exceptions import NotFound
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import storage
+from requests.adapters import HTTPAdapter
+
+
+# Connections kept open per host by the shared client's HTTP session
+HTTP_POOL_SIZE = 32
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+	"""Return the process-wide storage.Client, creating it (and its pooled session) on first use."""
+	global _client
+	with _client_lock:
+		if _client is None:
+			credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+			session = AuthorizedSession(credentials)
+			adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+			session.mount("https://", adapter)
+			_client = storage.Client(project=project, credentials=credentials, _http=session)
+	return _client
+
+
+def is_gs_path(path):
+	return str(path).startswith("gs://")
+
+
+def split_gs_path(path):
+	"""gs://bucket/some/name -> ("bucket", "some/name")"""
+	bucket_name, _, name = path[len("gs://"):].partition("/")
+	return bucket_name, name
+
+
+def _bucket(bucket_name, billing_project=None):
+	"""Bucket handle; requests on it are billed to `billing_project` when set (needed for requester-pays buckets)."""
+	return get_client().bucket(bucket_name, user_project=billing_project)
+
+
+def _blob(path, billing_project=None):
+	bucket_name, name = split_gs_path(path)
+	return _bucket(bucket_name, billing_project).blob(name)
+
+
+def _join(base, rel_path):
+	if is_gs_path(base):
+		return f"{base.rstrip('/')}/{rel_path}"
+	return os.path.join(base, rel_path)
+
+
+def _basename(path):
+	return str(path).rstrip("/").split("/")[-1]
+
+
+def _local_md5(file_path):
+	md5 = hashlib.md5()
+	with open(file_path, "rb") as f:
+		for chunk in iter(lambda: f.read(1024 * 1024), b""):
+			md5.update(chunk)
+	return base64.b64encode(md5.digest()).decode("ascii")
+
+
+def _list_tree(path, billing_project=None):
+	"""
+	Recursively list files under a gs:// prefix or local directory.
+
+	Returns {relative_path: (size, md5)}; md5 is base64 for objects (None for composite objects)
+	and None for local files, which are hashed lazily only when sizes match.
+	"""
+	if is_gs_path(path):
+		bucket_name, name = split_gs_path(path)
+		prefix = f"{name.rstrip('/')}/" if name else ""
+		return {
+			blob.name[len(prefix):]: (blob.size, blob.md5_hash)
+			for blob in get_client().list_blobs(_bucket(bucket_name, billing_project), prefix=prefix)
+			if not blob.name.endswith("/")
+		}
+	tree = {}
+	for root, _dirs, files in os.walk(path):
+		for file_name in files:
+			file_path = os.path.join(root, file_name)
+			rel_path = os.path.relpath(file_path, path).replace(os.sep, "/")
+			tree[rel_path] = (os.path.getsize(file_path), None)
+	return tree
+
+
+def _copy_object(source_path, destination_path, billing_project=None):
+	logging.info(f"Copying {source_path} to {destination_path}")
+	if is_gs_path(source_path) and is_gs_path(destination_path):
+		source_blob = _blob(source_path, billing_project)
+		destination_blob = _blob(destination_path, billing_project)
+		# rewrite() handles cross-location and large objects that copy_blob() cannot do in one call
+		token, _bytes_rewritten, _total_bytes = destination_blob.rewrite(source_blob)
+		while token is not None:
+			token, _bytes_rewritten, _total_bytes = destination_blob.rewrite(source_blob, token=token)
+	elif is_gs_path(source_path):
+		os.makedirs(os.path.dirname(os.path.abspath(destination_path)), exist_ok=True)
+		_blob(source_path, billing_project).download_to_filename(destination_path)
+	elif is_gs_path(destination_path):
+		_blob(destination_path, billing_project).upload_from_filename(source_path)
+	else:
+		raise ValueError(f"At least one of [{source_path}] and [{destination_path}] must be a gs:// path")
+
+
+def _folder_exists(path, billing_project=None):
+	"""Whether a gs:// bucket root, a gs:// prefix with at least one object under it, or a local directory exists."""
+	if not is_gs_path(path):
+		return os.path.isdir(path)
+	bucket_name, name = split_gs_path(path)
+	if not name.strip("/"):
+		return True
+	prefix = f"{name.rstrip('/')}/"
+	return any(True for _ in get_client().list_blobs(_bucket(bucket_name, billing_project), prefix=prefix, max_results=1))
+
+
+def copy(source_path, destination_path, recursive=False, billing_project=None):
+	"""
+	Copy a file/object, or a whole folder when `recursive` is True.
+
+	Like `gcloud storage cp`, a destination ending in '/' (or an existing local directory) receives
+	the source under its own name. A recursive copy lands in `destination_path/<source folder name>/`
+	when the destination folder already exists (a bucket root, a prefix with objects under it, or a
+	local directory), and otherwise becomes `destination_path/` itself. Requests are billed to
+	`billing_project` when set, as requester-pays buckets require.
+	"""
+	source_path = str(source_path)
+	destination_path = str(destination_path)
+	if recursive:
+		if _folder_exists(destination_path, billing_project):
+			destination_root = _join(destination_path, _basename(source_path))
+		else:
+			destination_root = destination_path
+		for rel_path in _list_tree(source_path, billing_project):
+			_copy_object(_join(source_path, rel_path), _join(destination_root, rel_path), billing_project)
+		return
+	if destination_path.endswith("/") or (not is_gs_path(destination_path) and os.path.isdir(destination_path)):
+		destination_path = _join(destination_path, _basename(source_path))
+	_copy_object(source_path, destination_path, billing_project)
+
+
+def _remove_object(path, billing_project=None):
+	if is_gs_path(path):
+		_blob(path, billing_project).delete()
+	else:
+		os.remove(path)
+
+
+def move(source_path, destination_path, billing_project=None):
+	copy(source_path, destination_path, billing_project=billing_project)
+	_remove_object(str(source_path), billing_project)
+
+
+def remove(path, billing_project=None):
+	"""
+	Delete one object, or the objects matched by a wildcard in the last path component
+	(e.g. gs://bucket/metadata/release/* deletes files directly under release/ but keeps sub-folders).
+	Requests are billed to `billing_project` when set.
+
+	Returns the number of objects deleted.
+	"""
+	bucket_name, name = split_gs_path(path)
+	folder, _, pattern = name.rpartition("/")
+	if not any(char in pattern for char in "*?["):
+		try:
+			_blob(path, billing_project).delete()
+		except NotFound:
+			return 0
+		logging.info(f"Removing {path}")
+		return 1
+	if any(char in folder for char in "*?["):
+		raise ValueError(f"Wildcards are only supported in the last path component: [{path}]")
+
+	prefix = f"{folder}/" if folder else ""
+	bucket = _bucket(bucket_name, billing_project)
+	removed = 0
+	for blob in get_client().list_blobs(bucket, prefix=prefix, delimiter="/"):
+		if fnmatch.fnmatchcase(blob.name[len(prefix):], pattern):
+			logging.info(f"Removing gs://{bucket_name}/{blob.name}")
+			bucket.blob(blob.name).delete()
+			removed += 1
+	return removed
+
+
+def list_dir(path, billing_project=None):
+	"""
+	Return the immediate contents of a bucket/folder formatted like `gcloud storage ls` stdout
+	(one gs:// URL per line, folders with a trailing '/'). Requests are billed to `billing_project` when set.
+
+	Raises subprocess.CalledProcessError when nothing matches, as the CLI does, so callers that
+	probe for folder existence behave the same with either backend.
+	"""
+	bucket_name, name = split_gs_path(path)
+	bucket = _bucket(bucket_name, billing_project)
+	if name and not name.endswith("/"):
+		if bucket.get_blob(name) is not None:
+			return f"gs://{bucket_name}/{name}\n"
+		name = f"{name}/"
+	blobs = get_client().list_blobs(bucket, prefix=name, delimiter="/")
+	lines = [f"gs://{bucket_name}/{blob.name}" for blob in blobs]
+	lines += [f"gs://{bucket_name}/{prefix}" for prefix in blobs.prefixes]
+	if not lines:
+		raise subprocess.CalledProcessError(
+			1, ["gcloud", "storage", "ls", path],
+			output="", stderr=f"ERROR: One or more URLs matched no objects: {path}"
+		)
+	return "\n".join(sorted(lines)) + "\n"
+
+
+def _needs_copy(source_path, source_entry, destination_path, destination_entry):
+	if destination_entry is None:
+		return True
+	source_size, source_md5 = source_entry
+	destination_size, destination_md5 = destination_entry
+	if source_size != destination_size:
+		return True
+	source_md5 = source_md5 or (None if is_gs_path(source_path) else _local_md5(source_path))
+	destination_md5 = destination_md5 or (None if is_gs_path(destination_path) else _local_md5(destination_path))
+	# Composite objects have no md5; fall back to the size comparison above
+	return bool(source_md5 and destination_md5 and source_md5 != destination_md5)
+
+
+def rsync(source_path, destination_path, dry_run, delete_unmatched=False, billing_project=None):
+	"""
+	Recursively make `destination_path` match `source_path` (size + md5 comparison), like
+	`gcloud storage rsync -r`. With `delete_unmatched`, destination files absent from the source
+	are deleted. Requests are billed to `billing_project` when set.
+	"""
+	source_path = str(source_path)
+	destination_path = str(destination_path)
+	source_tree = _list_tree(source_path, billing_project)
+	if is_gs_path(destination_path) or os.path.isdir(destination_path):
+		destination_tree = _list_tree(destination_path, billing_project)
+	else:
+		destination_tree = {}
+
+	for rel_path, source_entry in sorted(source_tree.items()):
+		source_file = _join(source_path, rel_path)
+		destination_file = _join(destination_path, rel_path)
+		if _needs_copy(source_file, source_entry, destination_file, destination_tree.get(rel_path)):
+			if dry_run:
+				logging.info(f"Would copy {source_file} to {destination_file}")
+			else:
+				_copy_object(source_file, destination_file, billing_project)
+
+	if delete_unmatched:
+		for rel_path in sorted(destination_tree.keys() - source_tree.keys()):
+			destination_file = _join(destination_path, rel_path)
+			if dry_run:
+				logging.info(f"Would remove {destination_file}")
+			else:
+				logging.info(f"Removing {destination_file}")
+				_remove_object(destination_file, billing_project)
+
+
+__all__ = [
+    "HTTP_POOL_SIZE", "get_client", "is_gs_path", "split_gs_path",
+    "copy", "move", "remove", "list_dir", "rsync",
+]
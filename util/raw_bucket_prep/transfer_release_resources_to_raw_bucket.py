@@ -31,7 +31,7 @@ from pathlib import Path
 
 import os, sys
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
-from gcloud_ops import gcopy
+from gcloud_ops import gcopy_many, set_default_backend, STORAGE_BACKENDS, GCLOUD_BACKEND
 import os, sys
 from collections import defaultdict
 import json
@@ -64,6 +64,7 @@ logging.basicConfig(
 def main(args):
 
     dry_run = not args.promote
+    set_default_backend(args.storage_backend)
 
     ### Load options from config/json file
     config_json = args.infile_json
@@ -108,6 +109,7 @@ def main(args):
 
     # Transfers validated files per dataset
     # to gs://asap-raw-team-<dataset_id>/release-resources/<release_version>/
+    transfer_pairs = []
     for dataset_id in dataset_ids:
         bucket_name = f"gs://asap-raw-{dataset_id}"
         release_resources_bucket = f"{bucket_name}/release_resources/{release_version}" # Note: "release_resources" (with underscore)
@@ -118,9 +120,14 @@ def main(args):
                 logging.info(f"Would copy {local_file_path} to {bucket_file_path}")
             else:
                 logging.info(f"Transferring file: {local_file_path} to {bucket_file_path}")
-                gcopy(source_path=str(local_file_path), 
-                      destination_path=bucket_file_path,
-                      recursive=False)
+                transfer_pairs.append((str(local_file_path), bucket_file_path))
+
+    # All datasets are pushed as one batched, parallel transfer
+    failed_transfers = [result for result in gcopy_many(transfer_pairs) if not result.ok]
+    for result in failed_transfers:
+        logging.error(f"Failed to transfer {result.source} to {result.destination}: {result.error}")
+    if failed_transfers:
+        sys.exit(1)
     
 
 if __name__ == "__main__":
@@ -162,6 +169,14 @@ if __name__ == "__main__":
 		required=False,
 		help="Promote data (omit for dry run).\n\n"
 	)
+    parser.add_argument(
+        "-b",
+        "--storage-backend",
+        choices=STORAGE_BACKENDS,
+        default=GCLOUD_BACKEND,
+        required=False,
+        help="Copy files with the gcloud CLI (one process per file) or a shared google.cloud.storage client (default: %(default)s).\n\n"
+    )
 
     args = parser.parse_args()
     main(args)
@@ -45,7 +45,6 @@ from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 import argparse
-import pandas as pd
 
 repo_root = Path(__file__).resolve().parents[2]
 metadata_root = repo_root.parent / "asap-crn-cloud-dataset-metadata"
@@ -56,17 +55,20 @@ sys.path.insert(0, str(crn_utils_root))
 sys.path.insert(0, str(metadata_root / "utils"))
 
 # wf-common
-from gcloud_ops import gsync
+from gcloud_ops import gcopy_many
 from bucket_validation_utils import (
     validate_raw_bucket_and_folder_existence,
     list_bucket_structure,
+    FileMatcher,
+    FolderLookupMatch,
+    default_match_strategies,
     CORE_METADATA_FILES,
     SUPP_METADATA_FILES,
     )
 from file_utils import (
     get_file_extension,
     check_csv_rows,
-    detect_csv_delimiter,
+    MetadataTableCache,
     )
 
 # crn-utils
@@ -115,18 +117,6 @@ MANDATORY_COLS_PER_TABLE = {
     "subject_id": ["CLINPATH", "SAMPLE", "SUBJECT", "MOUSE", "CELL", "PROTEOMICS"],
 }
 
-# Illumina FASTQ naming suffixes after normalization (lowercase, hyphens → underscores).
-# Full form: <sample>_S<n>_L<n>_[R|I]<n>_<nnn>.fastq.gz
-_FULL_ILLUMINA_SUFFIX_RE = re.compile(r'_s\d+_l\d+_[ri]\d+_\d{3}\.fastq\.gz$')
-# Read + chunk form (no sample index): strips only _R<n>_<nnn>.fastq.gz so _L<n> stays in stem
-_READ_CHUNK_ILLUMINA_SUFFIX_RE = re.compile(r'_[ri]\d+_\d{3}\.fastq\.gz$')
-# Read form: <sample>_[R|I]<n>.fastq.gz
-_READ_ILLUMINA_SUFFIX_RE = re.compile(r'_[ri]\d+\.fastq\.gz$')
-
-# Known FASTQ extensions stripped from DATA.csv file_name values to derive the sample stem.
-# Ordered longest-first so '.fastq.gz' is matched before '.gz'.
-_FASTQ_EXTENSIONS = ('.fastq.gz', '.fq.gz', '.fastq', '.fq')
-
 emoji_success = "✅"
 emoji_error = "❌"
 emoji_warning = "⚠️"
@@ -195,65 +185,52 @@ def strip_metadata_suffixes(metadata_dir: Path) -> list:
     return renames
 
 
-def _normalize_filename(name: str) -> str:
-    """Lowercase and replace hyphens with underscores for fuzzy comparison."""
-    return name.lower().replace('-', '_')
-
-
-def _norm_sample_id(s: str) -> str:
-    """Lowercase and strip all separator chars for SAMPLE↔DATA fuzzy matching."""
-    return re.sub(r'[-_ ]', '', s.lower())
-
-
-def _strip_illumina_suffix(name: str) -> str:
+def download_metadata_tables(metadata_files: list, metadata_url: str, local_dir: Path,
+                             billing_project: str = None) -> list:
     """
-    Normalize a filename and strip its Illumina FASTQ suffix if present.
+    Download only the top-level CSV tables of a bucket's metadata/ folder.
 
-    Normalization lowercases and replaces hyphens with underscores before
-    suffix matching. The returned value is always in normalized form.
+    The validation stages only read `metadata/*.csv`, so the versioned copies
+    under e.g. original/, cde/ and release/ are never fetched. The tables are
+    copied in parallel with `gcopy_many`.
 
     Parameters
     ----------
-    name : str
-        Raw or already-normalized filename.
+    metadata_files : list of BucketFile
+        Listing of the metadata/ folder, as returned by `list_bucket_structure`.
+    metadata_url : str
+        gs:// URL of the metadata/ folder, with its case as found in the bucket.
+    local_dir : Path
+        Existing local directory to download into.
+    billing_project : str, optional
+        Project billed for the downloads; required for requester-pays buckets.
 
     Returns
     -------
-    str
-        Normalized filename with the Illumina suffix removed, or the normalized
-        original if no suffix matched.
+    list of CopyResult
+        One per table; failed copies carry an `error` instead of raising.
     """
-    norm = _normalize_filename(name)
-    for suffix_re in (_FULL_ILLUMINA_SUFFIX_RE, _READ_CHUNK_ILLUMINA_SUFFIX_RE, _READ_ILLUMINA_SUFFIX_RE):
-        stripped = suffix_re.sub('', norm)
-        if stripped != norm:
-            return stripped
-    return norm
-
-
-def _csv_stem(csv_norm: str) -> str:
-    """
-    Strip known FASTQ extensions from a normalized DATA file_name to get the sample stem.
+    prefix = metadata_url.rstrip('/') + '/'
+    pairs = []
+    for file_info in metadata_files:
+        if not file_info.path.startswith(prefix):
+            continue
+        name = file_info.path[len(prefix):]
+        if '/' in name or Path(name).suffix.lower() != '.csv' or name.startswith('._'):
+            continue
+        pairs.append((file_info.path, str(local_dir / name)))
+    return gcopy_many(pairs, billing_project=billing_project) if pairs else []
 
-    Parameters
-    ----------
-    csv_norm : str
-        Normalized file_name value (lowercase, hyphens → underscores).
 
-    Returns
-    -------
-    str
-        Sample stem, or the full name if no known extension matched.
-    """
-    for ext in _FASTQ_EXTENSIONS:
-        if csv_norm.endswith(ext):
-            return csv_norm[:-len(ext)]
-    return csv_norm
+def _norm_sample_id(s: str) -> str:
+    """Lowercase and strip all separator chars for SAMPLE↔DATA fuzzy matching."""
+    return re.sub(r'[-_ ]', '', s.lower())
 
 
 # ── Analysis ───────────────────────────────────────────────────────────────────
 
-def analyze_metadata(metadata_dir: Path, min_csv_rows: int = 2) -> dict:
+def analyze_metadata(metadata_dir: Path, min_csv_rows: int = 2,
+                     tables: MetadataTableCache | None = None) -> dict:
     """
     Check metadata CSV files in the root of a local metadata directory for
     sufficient row counts.
@@ -266,6 +243,8 @@ def analyze_metadata(metadata_dir: Path, min_csv_rows: int = 2) -> dict:
         Local directory containing downloaded metadata CSV files.
     min_csv_rows : int
         Minimum required rows (including header).
+    tables : MetadataTableCache, optional
+        Shared cache of parsed metadata tables; a private one is used if omitted.
 
     Returns
     -------
@@ -276,6 +255,7 @@ def analyze_metadata(metadata_dir: Path, min_csv_rows: int = 2) -> dict:
             Human-readable descriptions of any insufficient or unreadable files.
     """
     results = {'csv_files': {}, 'issues': []}
+    tables = tables or MetadataTableCache()
 
     if not metadata_dir or not metadata_dir.exists():
         results['issues'].append('Metadata folder not accessible')
@@ -287,7 +267,7 @@ def analyze_metadata(metadata_dir: Path, min_csv_rows: int = 2) -> dict:
     ]
 
     for csv_file in csv_files:
-        csv_result = check_csv_rows(csv_file, min_csv_rows)
+        csv_result = check_csv_rows(csv_file, min_csv_rows, table=tables.get(csv_file))
         results['csv_files'][csv_file.name] = csv_result
         if csv_result['status'] == 'insufficient':
             results['issues'].append(
@@ -301,7 +281,8 @@ def analyze_metadata(metadata_dir: Path, min_csv_rows: int = 2) -> dict:
     return results
 
 
-def check_mandatory_column_consistency(metadata_dir: Path, mandatory_cols: dict) -> list[dict]:
+def check_mandatory_column_consistency(metadata_dir: Path, mandatory_cols: dict,
+                                       tables: MetadataTableCache | None = None) -> list[dict]:
     """
     Check mandatory column presence and value consistency across metadata tables.
 
@@ -316,6 +297,8 @@ def check_mandatory_column_consistency(metadata_dir: Path, mandatory_cols: dict)
     mandatory_cols : dict
         Keys are column names (e.g. 'sample_id'); values are lists of table stems
         (without .csv, any case) that should contain that column.
+    tables : MetadataTableCache, optional
+        Shared cache of parsed metadata tables; a private one is used if omitted.
 
     Returns
     -------
@@ -339,6 +322,7 @@ def check_mandatory_column_consistency(metadata_dir: Path, mandatory_cols: dict)
     """
     if not metadata_dir or not metadata_dir.exists():
         return []
+    tables = tables or MetadataTableCache()
 
     stem_map = {
         f.stem.upper(): f.stem
@@ -357,14 +341,7 @@ def check_mandatory_column_consistency(metadata_dir: Path, mandatory_cols: dict)
 
         name_to_df = {}
         for t, stem in present.items():
-            table_path = metadata_dir / f"{stem}.csv"
-            delim = detect_csv_delimiter(table_path)
-            for enc in ('utf-8-sig', 'utf-8', 'latin-1'):
-                try:
-                    name_to_df[t] = pd.read_csv(table_path, sep=delim, encoding=enc)
-                    break
-                except UnicodeDecodeError:
-                    continue
+            name_to_df[t] = tables.get(metadata_dir / f"{stem}.csv").frame()
 
         col_found_in = {}
         col_missing_in = []
@@ -425,8 +402,8 @@ def analyze_folder(files: list, gs_bucket: str,
 
     Parameters
     ----------
-    files : list of dictc
-        File-info dicts from `list_bucket_structure` (keys: 'path', 'size', 'size_str').
+    files : list of BucketFile
+        Records from `list_bucket_structure` (attributes: 'path', 'size', 'size_str').
     gs_bucket : str
         GCS bucket URL (used to compute relative paths).
     number_subdirs : int
@@ -452,7 +429,7 @@ def analyze_folder(files: list, gs_bucket: str,
     subfolders = set()
 
     for file_info in files:
-        path = file_info['path']
+        path = file_info.path
         ext = get_file_extension(path)
         results['extensions'][ext if ext else 'no_extension'] += 1
 
@@ -467,10 +444,10 @@ def analyze_folder(files: list, gs_bucket: str,
 
         results['folder_structure'][folder_path][ext if ext else 'no_extension'] += 1
 
-        if file_info['size'] < min_file_size:
-            results['potentially_empty'].append({'path': path, 'size': file_info['size_str']})
+        if file_info.size < min_file_size:
+            results['potentially_empty'].append({'path': path, 'size': file_info.size_str})
 
-        results['total_size'] += file_info['size']
+        results['total_size'] += file_info.size
 
         if len(path_parts) > 2:
             subfolders.add(path_parts[1])
@@ -485,6 +462,7 @@ def check_three_way_consistency(
     raw_files: list,
     data_csv_name: str,
     extra_folder_files: dict | None = None,
+    tables: MetadataTableCache | None = None,
 ) -> dict:
     """
     Three-way consistency check: SAMPLE.sample_id vs. DATA.sample_id/file_name vs. bucket files.
@@ -498,14 +476,16 @@ def check_three_way_consistency(
     ----------
     metadata_dir : Path
         Local directory containing downloaded metadata CSV files.
-    raw_files : list of dict
-        File-info dicts from the raw/ folder (keys: 'path', 'size', 'size_str').
+    raw_files : list of BucketFile
+        Records from the raw/ folder (attributes: 'path', 'size', 'size_str').
         Pass an empty list when no raw folder exists.
     data_csv_name : str
         Expected name of the DATA file (e.g. 'DATA.csv'), matched case-insensitively.
     extra_folder_files : dict or None, optional
         Additional folders to search for DATA files missing from raw/.
-        Keys are folder names (e.g. 'spatial'), values are file-info dict lists.
+        Keys are folder names (e.g. 'spatial'), values are BucketFile lists.
+    tables : MetadataTableCache, optional
+        Shared cache of parsed metadata tables; a private one is used if omitted.
 
     Returns
     -------
@@ -529,6 +509,8 @@ def check_three_way_consistency(
         n_in_sample_only : int
         n_in_data_only : int
         n_only_bucket : int
+        match_stage_seconds : dict
+            Wall-clock seconds per bucket matching stage that ran.
         issues : list of str
     """
     result = {
@@ -545,6 +527,7 @@ def check_three_way_consistency(
         'n_prefix': 0,
         'n_found_in_extra': 0,
         'found_in_extra_folders': {},
+        'match_stage_seconds': {},
         'n_missing_bucket': 0,
         'n_file_name_is_path': 0,
         'n_in_sample_only': 0,
@@ -554,6 +537,8 @@ def check_three_way_consistency(
         'issues': [],
     }
 
+    tables = tables or MetadataTableCache()
+
     # ── 1. Read SAMPLE.sample_id ──────────────────────────────────────
     sample_ids_from_sample = {}  # lower → original
     if metadata_dir and metadata_dir.exists():
@@ -566,27 +551,20 @@ def check_three_way_consistency(
                 break
         if sample_csv_path:
             result['sample_csv_found'] = True
-            sample_delim = detect_csv_delimiter(sample_csv_path)
-            for encoding in ('utf-8-sig', 'utf-8', 'latin-1'):
-                try:
-                    with open(sample_csv_path, 'r', encoding=encoding) as fh:
-                        reader = csv.DictReader(fh, delimiter=sample_delim)
-                        col = next(
-                            (k for k in (reader.fieldnames or []) if k.lower().strip() == 'sample_id'),
-                            None,
-                        )
-                        if col:
-                            result['sample_id_col_found'] = True
-                            for row in reader:
-                                val = row[col].strip()
-                                if val:
-                                    sample_ids_from_sample[val.lower()] = val
-                    break
-                except UnicodeDecodeError:
-                    continue
-                except Exception as e:
-                    result['issues'].append(f"Could not read SAMPLE.csv: {e}")
-                    break
+            try:
+                sample_table = tables.get(sample_csv_path)
+                col = next(
+                    (k for k in (sample_table.fieldnames or []) if k.lower().strip() == 'sample_id'),
+                    None,
+                )
+                if col:
+                    result['sample_id_col_found'] = True
+                    for row in sample_table.dict_rows():
+                        val = row[col].strip()
+                        if val:
+                            sample_ids_from_sample[val.lower()] = val
+            except Exception as e:
+                result['issues'].append(f"Could not read SAMPLE.csv: {e}")
 
     # ── 2. Read DATA.csv ──────────────────────────────────────────────
     data_csv_path = None
@@ -605,51 +583,45 @@ def check_three_way_consistency(
     data_by_sample = defaultdict(list)  # lower sample_id → [{'sample_id': str, 'file_name': str}]
     all_file_names = []
 
-    data_delim = detect_csv_delimiter(data_csv_path)
-    for encoding in ('utf-8-sig', 'utf-8', 'latin-1'):
-        try:
-            with open(data_csv_path, 'r', encoding=encoding) as fh:
-                reader = csv.DictReader(fh, delimiter=data_delim)
-                fieldnames = reader.fieldnames or []
-                sample_id_key = next(
-                    (k for k in fieldnames if k.lower().strip() == 'sample_id'), None
-                )
-                file_name_key = next(
-                    (k for k in fieldnames if k.lower().strip() == 'file_name'), None
-                )
-                if sample_id_key:
-                    result['data_sample_id_col_found'] = True
-                if file_name_key:
-                    result['data_file_name_col_found'] = True
-                if not sample_id_key:
-                    result['issues'].append(f"No 'sample_id' column in {data_csv_name}")
-                    return result
-                if not file_name_key:
-                    result['issues'].append(f"No 'file_name' column in {data_csv_name}")
-                    return result
-                for row in reader:
-                    sid = row[sample_id_key].strip()
-                    fn_raw = row[file_name_key].strip()
-                    fn = os.path.basename(fn_raw)
-                    if sid and fn:
-                        data_by_sample[sid.lower()].append({
-                            'sample_id': sid,
-                            'file_name': fn,
-                            'file_name_was_path': fn != fn_raw,
-                        })
-                        all_file_names.append(fn)
-            break
-        except UnicodeDecodeError:
-            continue
-        except Exception as e:
-            result['issues'].append(f"Could not read {data_csv_name}: {e}")
+    try:
+        data_table = tables.get(data_csv_path)
+        fieldnames = data_table.fieldnames or []
+        sample_id_key = next(
+            (k for k in fieldnames if k.lower().strip() == 'sample_id'), None
+        )
+        file_name_key = next(
+            (k for k in fieldnames if k.lower().strip() == 'file_name'), None
+        )
+        if sample_id_key:
+            result['data_sample_id_col_found'] = True
+        if file_name_key:
+            result['data_file_name_col_found'] = True
+        if not sample_id_key:
+            result['issues'].append(f"No 'sample_id' column in {data_csv_name}")
+            return result
+        if not file_name_key:
+            result['issues'].append(f"No 'file_name' column in {data_csv_name}")
             return result
+        for row in data_table.dict_rows():
+            sid = row[sample_id_key].strip()
+            fn_raw = row[file_name_key].strip()
+            fn = os.path.basename(fn_raw)
+            if sid and fn:
+                data_by_sample[sid.lower()].append({
+                    'sample_id': sid,
+                    'file_name': fn,
+                    'file_name_was_path': fn != fn_raw,
+                })
+                all_file_names.append(fn)
+    except Exception as e:
+        result['issues'].append(f"Could not read {data_csv_name}: {e}")
+        return result
 
     # ── 3. Bucket file list ───────────────────────────────────────────
     bucket_file_names = []
     md5_file_names = []
     for file_info in raw_files:
-        basename = os.path.basename(file_info['path'])
+        basename = os.path.basename(file_info.path)
         if basename.endswith('.md5'):
             md5_file_names.append(basename)
         else:
@@ -657,157 +629,24 @@ def check_three_way_consistency(
     result['md5_files'] = md5_file_names
 
     # ── 4. Bucket matching ────────────────────────────────────────────
-    csv_set = set(all_file_names)
-    bucket_set = set(bucket_file_names)
-    matched = sorted(csv_set & bucket_set)
-    unmatched_csv = csv_set - bucket_set
-    unmatched_bucket = bucket_set - csv_set
-
-    # Partial matches (Illumina suffix — files need renaming, not errors)
-    partial_matches = []
-    partial_csv_names = set()
-    partial_bucket_names = set()
-    if unmatched_csv and unmatched_bucket:
-        _suffix_patterns = [
-            (_FULL_ILLUMINA_SUFFIX_RE, 'illumina_suffix_full'),
-            (_READ_CHUNK_ILLUMINA_SUFFIX_RE, 'illumina_suffix_read_chunk'),
-            (_READ_ILLUMINA_SUFFIX_RE, 'illumina_suffix_read'),
-        ]
-        illumina_bucket_map = defaultdict(list)
-        for name_in_bucket in unmatched_bucket:
-            name_norm = _normalize_filename(name_in_bucket)
-            for suffix_re, match_type in _suffix_patterns:
-                stripped = suffix_re.sub('', name_norm)
-                if stripped != name_norm:
-                    illumina_bucket_map[stripped].append((name_in_bucket, match_type))
-                    break
-        for name_in_data in sorted(unmatched_csv):
-            stem = _csv_stem(_normalize_filename(name_in_data))
-            if stem in illumina_bucket_map:
-                entries = sorted(illumina_bucket_map[stem], key=lambda x: x[0])
-                bucket_matched = [b for b, _ in entries]
-                types = sorted({mt for _, mt in entries})
-                match_type = types[0] if len(types) == 1 else 'illumina_suffix_mixed'
-                partial_matches.append({
-                    'csv_name': name_in_data,
-                    'bucket_names': bucket_matched,
-                    'match_type': match_type,
-                })
-                partial_csv_names.add(name_in_data)
-                partial_bucket_names.update(bucket_matched)
-
-    in_csv_only_set = unmatched_csv - partial_csv_names
-    in_bucket_only_set = unmatched_bucket - partial_bucket_names
-
-    # Fuzzy matches (typos — still errors)
-    fuzzy_matches = []
-    if in_csv_only_set and in_bucket_only_set:
-        bucket_norm_map = {_normalize_filename(b): b for b in in_bucket_only_set}
-        for csv_name in sorted(in_csv_only_set):
-            csv_norm = _normalize_filename(csv_name)
-            if csv_norm in bucket_norm_map:
-                fuzzy_matches.append({
-                    'csv_name': csv_name,
-                    'bucket_name': bucket_norm_map[csv_norm],
-                    'match_type': 'separator_mismatch',
-                })
-                continue
-            csv_stem_val = _csv_stem(csv_norm)
-            csv_ext = csv_norm[len(csv_stem_val):]
-            csv_stem_stripped = re.sub(r'_\d+$', '', csv_stem_val)
-            if not csv_stem_stripped:
-                continue
-            for b_norm, b_name in bucket_norm_map.items():
-                b_stem_val = _csv_stem(b_norm)
-                b_ext = b_norm[len(b_stem_val):]
-                if csv_ext != b_ext:
-                    continue
-                b_stem_stripped = re.sub(r'_\d+$', '', b_stem_val)
-                if csv_stem_stripped == b_stem_stripped:
-                    fuzzy_matches.append({
-                        'csv_name': csv_name,
-                        'bucket_name': b_name,
-                        'match_type': 'numeric_suffix_mismatch',
-                    })
-                    break
-
-    fuzzy_csv_names = {fm['csv_name'] for fm in fuzzy_matches}
-    fuzzy_bucket_names = {fm['bucket_name'] for fm in fuzzy_matches}
-    remaining_csv = in_csv_only_set - fuzzy_csv_names
-    remaining_bucket = in_bucket_only_set - fuzzy_bucket_names
-
-    # Prefix matches (name containment)
-    prefix_matches = []
-    if remaining_csv and remaining_bucket:
-        bucket_stem_map = defaultdict(list)
-        for name_in_bucket in remaining_bucket:
-            bucket_stem_map[_csv_stem(_strip_illumina_suffix(name_in_bucket))].append(name_in_bucket)
-        for name_in_data in sorted(remaining_csv):
-            csv_stem_val = _csv_stem(_normalize_filename(name_in_data))
-            if not csv_stem_val:
-                continue
-            for b_stem, b_names in sorted(bucket_stem_map.items()):
-                short, long_ = (
-                    (csv_stem_val, b_stem) if len(csv_stem_val) <= len(b_stem)
-                    else (b_stem, csv_stem_val)
-                )
-                if long_.startswith(short) and (len(long_) == len(short) or long_[len(short)] == '_'):
-                    match_type = (
-                        'DATA_prefix_of_bucket' if len(csv_stem_val) <= len(b_stem)
-                        else 'bucket_prefix_of_DATA'
-                    )
-                    prefix_matches.append({
-                        'csv_name': name_in_data,
-                        'bucket_names': sorted(b_names),
-                        'match_type': match_type,
-                    })
-                    break
-
-    prefix_csv_names = {pm['csv_name'] for pm in prefix_matches}
-    prefix_bucket_names = {b for pm in prefix_matches for b in pm['bucket_names']}
-    truly_missing = remaining_csv - prefix_csv_names
-    in_bucket_only_final = sorted(remaining_bucket - prefix_bucket_names)
-
-    # Extra folder lookup (e.g. spatial/)
-    found_in_extra = {}
-    missing_in_bucket_list = list(truly_missing)
-    if extra_folder_files and missing_in_bucket_list:
-        remaining = list(missing_in_bucket_list)
-        for folder_name, folder_files in extra_folder_files.items():
-            if not remaining:
-                break
-            norm_map = {
-                _normalize_filename(os.path.basename(f['path'])): os.path.basename(f['path'])
-                for f in folder_files
-                if not f['path'].endswith('/')
-            }
-            found_here, still_remaining = [], []
-            for name in remaining:
-                if _normalize_filename(name) in norm_map:
-                    found_here.append(name)
-                else:
-                    still_remaining.append(name)
-            if found_here:
-                found_in_extra[folder_name] = found_here
-            remaining = still_remaining
-        missing_in_bucket_list = remaining
-
-    result['found_in_extra_folders'] = {k: len(v) for k, v in found_in_extra.items()}
+    # exact → Illumina suffix (files need renaming, not errors) → fuzzy (typos,
+    # still errors) → prefix (name containment) → extra folders (e.g. spatial/)
+    strategies = default_match_strategies(extra_folder_files)
+    match_result = FileMatcher(strategies).run(all_file_names, bucket_file_names)
+    result['match_stage_seconds'] = match_result.stage_seconds
+    result['found_in_extra_folders'] = {
+        strategy.folder_name: len(match_result.matches[strategy.name])
+        for strategy in strategies
+        if isinstance(strategy, FolderLookupMatch) and match_result.matches.get(strategy.name)
+    }
+    in_bucket_only_final = sorted(match_result.unmatched_bucket)
 
     # ── 5. Build file_match_map ───────────────────────────────────────
     file_match_map = {}
-    for name in matched:
-        file_match_map[name] = {'type': 'exact', 'bucket_files': [name]}
-    for pm in partial_matches:
-        file_match_map[pm['csv_name']] = {'type': pm['match_type'], 'bucket_files': pm['bucket_names']}
-    for fm in fuzzy_matches:
-        file_match_map[fm['csv_name']] = {'type': fm['match_type'], 'bucket_files': [fm['bucket_name']]}
-    for pm in prefix_matches:
-        file_match_map[pm['csv_name']] = {'type': pm['match_type'], 'bucket_files': pm['bucket_names']}
-    for folder_name, found_files in found_in_extra.items():
-        for name in found_files:
-            file_match_map[name] = {'type': f'found_in_{folder_name}', 'bucket_files': [name]}
-    for name in missing_in_bucket_list:
+    for stage_matches in match_result.matches.values():
+        for match in stage_matches:
+            file_match_map[match.data_name] = {'type': match.match_type, 'bucket_files': list(match.bucket_names)}
+    for name in match_result.unmatched_data:
         file_match_map[name] = {'type': 'missing_in_bucket', 'bucket_files': []}
 
     # ── 6. SAMPLE ↔ DATA join and row building ────────────────────────
@@ -1488,16 +1327,15 @@ def perform_bucket_validation(gs_bucket: str,
         shutil.rmtree(temp_dir)
     temp_dir.mkdir(exist_ok=True, parents=True)
 
-    # Resolve billing project once — needed by gsutil for requester-pays buckets.
-    # gcloud storage handles this automatically; gsutil requires explicit -u PROJECT.
-    _billing_project = subprocess.run(
+    # Metadata downloads from requester-pays buckets are billed to the active gcloud project.
+    billing_project = subprocess.run(
         ['gcloud', 'config', 'get-value', 'project'],
         capture_output=True, text=True,
     ).stdout.strip()
-    if not _billing_project:
+    if not billing_project:
         raise RuntimeError(
             "No active gcloud project configured — required for "
-            "requester-pays bucket access via gsutil. "
+            "requester-pays bucket access. "
             "Run: gcloud config set project PROJECT_ID"
         )
 
@@ -1557,47 +1395,35 @@ def perform_bucket_validation(gs_bucket: str,
         # METADATA CHECK
         metadata_dir = None
         metadata_renames = []
+        # Each metadata table is read and parsed once, then shared by every check below
+        tables = MetadataTableCache()
         if has_metadata:
             local_metadata_dir = temp_dir / "metadata"
             local_metadata_dir.mkdir(exist_ok=True, parents=True)
-            remote_metadata = f"{gs_bucket}/{metadata_folder_name}/"
-            print(f"  Downloading metadata from {remote_metadata}...")
-            try:
-                gsync(remote_metadata, str(local_metadata_dir), dry_run=False)
+            remote_metadata = f"{gs_bucket.rstrip('/')}/{metadata_folder_name}/"
+            print(f"  Downloading metadata tables from {remote_metadata}...")
+            copy_results = download_metadata_tables(
+                structure['metadata'], remote_metadata, local_metadata_dir, billing_project=billing_project
+            )
+            failed = [r for r in copy_results if not r.ok]
+            if failed:
+                for r in failed:
+                    print(f"    Warning: Could not download metadata: {r.source}: {r.error}")
+            else:
                 metadata_dir = local_metadata_dir
                 metadata_renames = strip_metadata_suffixes(local_metadata_dir)
-            except subprocess.CalledProcessError as e:
-                if 'matched more than one url' in (e.stderr or '').lower():
-                    # Bucket versioning causes gcloud storage rsync to see both live and
-                    # noncurrent versions of the metadata/ placeholder object. Fall back
-                    # to gsutil rsync, which ignores noncurrent versions by default.
-                    print(f"    Retrying with gsutil (bucket versioning conflict)...")
-                    try:
-                        result = subprocess.run(
-                            ['gsutil', '-u', _billing_project, '-m', 'rsync', '-r',
-                             remote_metadata, str(local_metadata_dir)],
-                            check=True, capture_output=True, text=True,
-                        )
-                        print(result.stdout + result.stderr)
-                        metadata_dir = local_metadata_dir
-                        metadata_renames = strip_metadata_suffixes(local_metadata_dir)
-                    except subprocess.CalledProcessError as e2:
-                        print(f"    Warning: Could not download metadata: {e2.stderr}")
-                else:
-                    print(f"    Warning: Could not download metadata: {e.stderr}")
             non_comma_files = []
             if metadata_dir and metadata_dir.exists():
                 for csv_file in sorted(
                     f for f in (list(metadata_dir.glob('*.csv')) + list(metadata_dir.glob('*.CSV')))
                     if f.is_file() and not f.name.startswith('._')
                 ):
-                    delim = detect_csv_delimiter(csv_file)
-                    if delim != ',':
+                    if tables.get(csv_file).delimiter != ',':
                         non_comma_files.append(csv_file.name)
             if non_comma_files:
                 results['non_comma_delimiter_files'] = non_comma_files
 
-            metadata_results = analyze_metadata(metadata_dir, MIN_CSV_ROWS)
+            metadata_results = analyze_metadata(metadata_dir, MIN_CSV_ROWS, tables=tables)
             results['metadata'] = metadata_results
             results['metadata_renames'] = metadata_renames
             found_csv_names = set(metadata_results.get('csv_files', {}).keys())
@@ -1627,7 +1453,7 @@ def perform_bucket_validation(gs_bucket: str,
                     f"METADATA: Missing {len(missing_core)} core CDE v4.x table(s) — {' · '.join(file_statuses)}"
                 )
 
-            col_check = check_mandatory_column_consistency(metadata_dir, MANDATORY_COLS_PER_TABLE)
+            col_check = check_mandatory_column_consistency(metadata_dir, MANDATORY_COLS_PER_TABLE, tables=tables)
             results['mandatory_col_check'] = col_check
             for entry in col_check:
                 if emoji_error in (entry['presence_status'], entry['values_status']):
@@ -1692,7 +1518,8 @@ def perform_bucket_validation(gs_bucket: str,
             _raw_label = f"/{raw_folder_name}/" if has_raw else "(no raw folder)"
             print(f"  Running three-way consistency check (SAMPLE / {data_file_name} / {_raw_label})...")
             three_way = check_three_way_consistency(
-                metadata_dir, _raw_files, data_file_name, extra_folder_files=extra_folder_files
+                metadata_dir, _raw_files, data_file_name, extra_folder_files=extra_folder_files,
+                tables=tables,
             )
             results['three_way_check'] = three_way
 
@@ -2009,6 +1836,7 @@ __all__ = [
     "emoji_error",
     "emoji_warning",
     "strip_metadata_suffixes",
+    "download_metadata_tables",
     "write_column_consistency_tsv",
     "write_data_inconsistencies_tsv",
     "analyze_metadata",